@@ -6,6 +6,7 @@ from datetime import timedelta
 from pathlib import Path
 
 import environ
+from celery.schedules import crontab
 
 BASE_DIR = Path(__file__).resolve(strict=True).parent.parent.parent
 # ranker/
@@ -325,6 +326,36 @@ CELERY_TASK_TIME_LIMIT = 5 * 60
 CELERY_TASK_SOFT_TIME_LIMIT = 60
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#beat-scheduler
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+# https://docs.celeryq.dev/en/stable/userguide/periodic-tasks.html#beat-entries
+CELERY_BEAT_SCHEDULE = {
+    # Keep the cached admin reports warm (see ranker.scores.reports)
+    "refresh-analytics-reports": {
+        "task": "ranker.scores.tasks.refresh_reports",
+        "schedule": 10 * 60,
+    },
+    # Superset materialized views (see ranker.scores.superset), refreshed
+    # more often the more time-sensitive their dashboards are
+    "refresh-superset-scoring-patterns": {
+        "task": "ranker.scores.tasks.refresh_superset_views",
+        "schedule": 5 * 60,
+        "args": (["superset_scoring_patterns"],),
+    },
+    "refresh-superset-activity-views": {
+        "task": "ranker.scores.tasks.refresh_superset_views",
+        "schedule": 15 * 60,
+        "args": (["superset_leaderboard_trends", "superset_daily_metrics"],),
+    },
+    "refresh-superset-summary-views": {
+        "task": "ranker.scores.tasks.refresh_superset_views",
+        "schedule": 60 * 60,
+        "args": (["superset_game_analytics", "superset_user_engagement", "superset_user_performance"],),
+    },
+    "refresh-superset-popularity-view": {
+        "task": "ranker.scores.tasks.refresh_superset_views",
+        "schedule": crontab(hour=3, minute=0),
+        "args": (["superset_game_popularity"],),
+    },
+}
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#worker-send-task-events
 CELERY_WORKER_SEND_TASK_EVENTS = True
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#std-setting-task_send_sent_event
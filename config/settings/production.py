@@ -24,6 +24,11 @@ ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS", default=["example.com"])
 # DATABASES
 # ------------------------------------------------------------------------------
 DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
+# pgbouncer runs in transaction pooling mode, which cannot keep a server-side
+# cursor open across transactions. Prepared statements are already disabled
+# by Django's psycopg backend.
+# https://docs.djangoproject.com/en/dev/ref/databases/#transaction-pooling-server-side-cursors
+DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
 
 # CACHES
 # ------------------------------------------------------------------------------
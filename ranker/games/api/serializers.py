@@ -20,15 +20,15 @@ class GameSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
 
-class GameListSerializer(serializers.ModelSerializer):
-    """Simplified serializer for Game list views."""
+class GameListSerializer(serializers.Serializer):
+    """
+    Simplified serializer for Game list views.
 
-    class Meta:
-        model = Game
-        fields = [
-            "id",
-            "name",
-            "score_type",
-            "is_active",
-        ]
-        read_only_fields = ["id"]
+    Declared as a plain Serializer so list responses (and nested game data in
+    score payloads) skip ModelSerializer's per-instance field introspection.
+    """
+
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField()
+    score_type = serializers.CharField()
+    is_active = serializers.BooleanField()
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.mixins import ListModelMixin
@@ -6,6 +7,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from ranker.games.cache import ACTIVE_GAMES_CACHE_KEY
+from ranker.games.cache import ACTIVE_GAMES_CACHE_TIMEOUT
 from ranker.games.models import Game
 
 from .serializers import GameListSerializer
@@ -20,16 +23,17 @@ class GameViewSet(RetrieveModelMixin, ListModelMixin, GenericViewSet):
     Only active games are shown to regular users.
     """
 
+    queryset = Game.objects.all()
     serializer_class = GameSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         """Return queryset based on user permissions."""
-        queryset = Game.objects.all()
+        queryset = super().get_queryset()
 
         # Only show active games to regular users
         if not self.request.user.is_staff:
-            queryset = queryset.filter(is_active=True)
+            return queryset.active()
 
         return queryset.order_by("name")
 
@@ -42,6 +46,16 @@ class GameViewSet(RetrieveModelMixin, ListModelMixin, GenericViewSet):
     @action(detail=False, methods=["get"])
     def active(self, request):
         """Get all active games."""
-        active_games = Game.objects.filter(is_active=True).order_by("name")
-        serializer = GameListSerializer(active_games, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = cache.get(ACTIVE_GAMES_CACHE_KEY)
+
+        if data is None:
+            # The rows already match GameListSerializer's fields, so skip model
+            # instantiation and serializer field binding entirely
+            data = list(
+                self.get_queryset()
+                .active()
+                .values("id", "name", "score_type", "is_active"),
+            )
+            cache.set(ACTIVE_GAMES_CACHE_KEY, data, ACTIVE_GAMES_CACHE_TIMEOUT)
+
+        return Response(data, status=status.HTTP_200_OK)
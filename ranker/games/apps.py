@@ -11,3 +11,4 @@ class GamesConfig(AppConfig):
 
     def ready(self):
         """Run when the app is ready."""
+        import ranker.games.signals  # noqa: F401, PLC0415
@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Game
+
+ACTIVE_GAMES_CACHE_KEY = "games:active"
+ACTIVE_GAMES_CACHE_TIMEOUT = 60
+
+GAME_CACHE_KEY = "game:{game_id}"
+GAME_CACHE_TIMEOUT = 300
+# Must follow the model field order, as Model.from_db() expects
+GAME_CACHE_FIELDS = ("id", "name", "is_active", "score_type")
+
+_MISSING = object()
+
+
+def get_game_cached(game_id):
+    """
+    Return the game with the given id, or None if it does not exist.
+
+    Only the fields in GAME_CACHE_FIELDS are cached and loaded; any other
+    field is deferred, as with QuerySet.only().
+    """
+    key = GAME_CACHE_KEY.format(game_id=game_id)
+    values = cache.get(key, _MISSING)
+    if values is _MISSING:
+        values = Game.objects.filter(pk=game_id).values_list(*GAME_CACHE_FIELDS).first()
+        cache.set(key, values, GAME_CACHE_TIMEOUT)
+    if values is None:
+        return None
+    return Game.from_db(DEFAULT_DB_ALIAS, GAME_CACHE_FIELDS, values)
+
+
+def get_game_status(game_id):
+    """Return whether a game is active, or None if it does not exist."""
+    game = get_game_cached(game_id)
+    return None if game is None else game.is_active
+
+
+def get_game_score_type(game_id):
+    """Return a game's score type, or None if the game does not exist."""
+    game = get_game_cached(game_id)
+    return None if game is None else game.score_type
+
+
+def invalidate_game_cache(game_id):
+    """Drop cached game data after a Game is created, changed or deleted."""
+    cache.delete_many([
+        ACTIVE_GAMES_CACHE_KEY,
+        GAME_CACHE_KEY.format(game_id=game_id),
+    ])
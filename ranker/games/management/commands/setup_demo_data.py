@@ -1,15 +1,42 @@
 import random
+from collections import defaultdict
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
+from django.db import connection
 from django.db import transaction
+from django.db.models import Count
+from django.db.models import Q
 
 from ranker.games.models import Game
 from ranker.scores.models import Score
+from ranker.scores.services import leaderboard_service
 
 User = get_user_model()
 
+SCORE_BATCH_SIZE = 1000
+
+# Demo rows are matched by prefix so lookups can use the b-tree indexes
+# (LIKE 'prefix%') instead of scanning with LIKE '%demo%'
+DEMO_EMAIL_PREFIX = "demo_user_"
+DEMO_GAME_PREFIX = "Demo "
+
+DEMO_LEVELS = range(1, 11)
+DEMO_DIFFICULTIES = ["easy", "medium", "hard"]
+DEMO_SESSION_IDS = [f"session_{n}" for n in range(1000, 10000)]
+
+DEMO_SCORE_GENERATORS = {
+    # Higher scores (100-10000)
+    "highest": lambda: Decimal(random.randint(100, 10000)),
+    # Lower scores (1-100)
+    "lowest": lambda: Decimal(random.randint(1, 100)),
+    # Time in seconds with decimals (10-300 seconds), drawn as hundredths so no
+    # float/str round-trip is needed
+    "time": lambda: Decimal(random.randint(1000, 30000)).scaleb(-2),
+}
+
 
 class Command(BaseCommand):
     help = "Set up demo data for the leaderboard system"
@@ -40,6 +67,12 @@ class Command(BaseCommand):
             self.clear_demo_data()
 
         with transaction.atomic():
+            if connection.vendor == "postgresql":
+                # Demo data is disposable, so don't wait for the WAL flush at
+                # commit. SET LOCAL only lasts until this transaction ends.
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL synchronous_commit TO OFF")
+
             # Create demo games
             games = self.create_demo_games()
 
@@ -57,13 +90,13 @@ class Command(BaseCommand):
         self.stdout.write("Clearing existing demo data...")
 
         # Delete scores first due to foreign key constraints
-        Score.objects.filter(user__email__contains="demo").delete()
+        Score.objects.filter(user__email__startswith=DEMO_EMAIL_PREFIX).delete()
 
         # Delete demo users
-        User.objects.filter(email__contains="demo").delete()
+        User.objects.filter(email__startswith=DEMO_EMAIL_PREFIX).delete()
 
         # Delete demo games
-        Game.objects.filter(name__contains="Demo").delete()
+        Game.objects.filter(name__startswith=DEMO_GAME_PREFIX).delete()
 
         self.stdout.write(self.style.SUCCESS("Demo data cleared."))
 
@@ -122,24 +155,27 @@ class Command(BaseCommand):
         """Create demo users."""
         self.stdout.write(f"Creating {count} demo users...")
 
-        users = []
-        for i in range(1, count + 1):
-            email = f"demo_user_{i}@example.com"
-            name = f"Demo User {i}"
-
-            user, created = User.objects.get_or_create(
-                email=email,
-                defaults={
-                    "name": name,
-                    "is_active": True,
-                },
-            )
+        names_by_email = {
+            f"{DEMO_EMAIL_PREFIX}{i}@example.com": f"Demo User {i}"
+            for i in range(1, count + 1)
+        }
+        existing = set(
+            User.objects.filter(email__in=names_by_email)
+            .values_list("email", flat=True),
+        )
 
-            if created:
-                user.set_password("demopass123")
-                user.save()
+        # Hash the shared demo password once instead of once per user
+        password = make_password("demopass123")
+        User.objects.bulk_create(
+            [
+                User(email=email, name=name, is_active=True, password=password)
+                for email, name in names_by_email.items()
+                if email not in existing
+            ],
+            batch_size=500,
+        )
 
-            users.append(user)
+        users = list(User.objects.filter(email__in=names_by_email))
 
         self.stdout.write(f"  Created/found {len(users)} demo users")
         return users
@@ -148,42 +184,57 @@ class Command(BaseCommand):
         """Create demo scores."""
         self.stdout.write(f"Creating {count} demo scores...")
 
-        scores_created = 0
-
-        for _ in range(count):
-            user = random.choice(users)
-            game = random.choice(games)
-
-            # Generate appropriate score based on game type
-            if game.score_type == "highest":
-                # Higher scores (0-10000)
-                score = Decimal(str(random.randint(100, 10000)))
-            elif game.score_type == "lowest":
-                # Lower scores (1-100)
-                score = Decimal(str(random.randint(1, 100)))
-            else:  # time
-                # Time in seconds with decimals (10-300 seconds)
-                score = Decimal(str(round(random.uniform(10.0, 300.0), 2)))
-
-            # Generate metadata
+        # Partition games by score type once, then draw every row's score type up
+        # front (weighted by bucket size, so games stay uniformly likely)
+        games_by_type = defaultdict(list)
+        for game in games:
+            games_by_type[game.score_type].append(game)
+        score_types = list(games_by_type)
+        weights = [len(games_by_type[score_type]) for score_type in score_types]
+
+        # Draw each metadata column in one call instead of per row
+        levels = random.choices(DEMO_LEVELS, k=count)
+        difficulties = random.choices(DEMO_DIFFICULTIES, k=count)
+        session_ids = random.choices(DEMO_SESSION_IDS, k=count)
+
+        scores = []
+        for score_type, user, level, difficulty, session_id in zip(
+            random.choices(score_types, weights=weights, k=count),
+            random.choices(users, k=count),
+            levels,
+            difficulties,
+            session_ids,
+            strict=True,
+        ):
+            game = random.choice(games_by_type[score_type])
+            score = DEMO_SCORE_GENERATORS[score_type]()
             metadata = {
-                "level": random.randint(1, 10),
-                "difficulty": random.choice(["easy", "medium", "hard"]),
-                "session_id": f"session_{random.randint(1000, 9999)}",
+                "level": level,
+                "difficulty": difficulty,
+                "session_id": session_id,
             }
 
-            # Create score
-            Score.objects.create(
-                user=user,
-                game=game,
-                score=score,
-                metadata=metadata,
+            scores.append(
+                Score(
+                    user=user,
+                    game=game,
+                    score=score,
+                    metadata=metadata,
+                    difficulty=difficulty,
+                    level=level,
+                ),
             )
 
-            scores_created += 1
+        # Insert in batches rather than one INSERT per score
+        scores_created = 0
+        for start in range(0, len(scores), SCORE_BATCH_SIZE):
+            batch = scores[start:start + SCORE_BATCH_SIZE]
+            Score.objects.bulk_create(batch)
+            scores_created += len(batch)
+            self.stdout.write(f"  Created {scores_created} scores...")
 
-            if scores_created % 50 == 0:
-                self.stdout.write(f"  Created {scores_created} scores...")
+        # bulk_create() bypasses Score.save(), so sync the Redis leaderboards here
+        leaderboard_service.rebuild_leaderboards([game.id for game in games])
 
         self.stdout.write(f"  Created {scores_created} demo scores")
 
@@ -193,25 +244,37 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS("DEMO DATA SETUP COMPLETE"))
         self.stdout.write(self.style.SUCCESS("="*50))
 
-        # Games summary
-        games_count = Game.objects.count()
-        self.stdout.write(f"Total Games: {games_count}")
+        # One GROUP BY query for every game's score count
+        games = list(
+            Game.objects.annotate(score_count=Count("scores"))
+            .order_by("name")
+            .values_list("name", "score_count"),
+        )
+        self.stdout.write(f"Total Games: {len(games)}")
 
         # Users summary
-        users_count = User.objects.count()
-        demo_users_count = User.objects.filter(email__contains="demo").count()
-        self.stdout.write(f"Total Users: {users_count} (including {demo_users_count} demo users)")
+        users = User.objects.aggregate(
+            total=Count("id"),
+            demo=Count("id", filter=Q(email__startswith=DEMO_EMAIL_PREFIX)),
+        )
+        self.stdout.write(
+            f"Total Users: {users['total']} (including {users['demo']} demo users)",
+        )
 
         # Scores summary
-        scores_count = Score.objects.count()
-        demo_scores_count = Score.objects.filter(user__email__contains="demo").count()
-        self.stdout.write(f"Total Scores: {scores_count} (including {demo_scores_count} demo scores)")
+        scores = Score.objects.aggregate(
+            total=Count("id"),
+            demo=Count("id", filter=Q(user__email__startswith=DEMO_EMAIL_PREFIX)),
+        )
+        self.stdout.write(
+            f"Total Scores: {scores['total']} "
+            f"(including {scores['demo']} demo scores)",
+        )
 
         # Per-game summary
         self.stdout.write("\nScores per game:")
-        for game in Game.objects.all():
-            game_scores = Score.objects.filter(game=game).count()
-            self.stdout.write(f"  {game.name}: {game_scores} scores")
+        for game_name, score_count in games:
+            self.stdout.write(f"  {game_name}: {score_count} scores")
 
         self.stdout.write("\n" + "="*50)
         self.stdout.write(self.style.SUCCESS("You can now test the leaderboard API endpoints!"))
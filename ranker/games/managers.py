@@ -0,0 +1,9 @@
+from django.db import models
+
+
+class GameQuerySet(models.QuerySet):
+    """Custom queryset for the Game model."""
+
+    def active(self):
+        """Return games currently accepting score submissions, ordered by name."""
+        return self.filter(is_active=True).order_by("name")
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.11 on 2026-10-15 21:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name'], name='game_active_name_idx'),
+        ),
+    ]
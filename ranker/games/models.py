@@ -1,6 +1,18 @@
+from functools import cached_property
+
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from .managers import GameQuerySet
+
+# Multiplier applied to a user score before it is stored in a Redis sorted set.
+# Redis orders members by ascending score, so highest-wins games are negated.
+_REDIS_SIGN = {
+    "highest": -1,
+    "lowest": 1,
+    "time": 1,
+}
+
 
 class Game(models.Model):
     """
@@ -50,10 +62,20 @@ class Game(models.Model):
         help_text=_("How scores should be ranked"),
     )
 
+    objects = GameQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Game")
         verbose_name_plural = _("Games")
         ordering = ["name"]
+        indexes = [
+            # Serves GameQuerySet.active(): only active rows, already in name order
+            models.Index(
+                fields=["name"],
+                condition=models.Q(is_active=True),
+                name="game_active_name_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -65,14 +87,14 @@ class Game(models.Model):
         """
         return f"leaderboard:{self.id}"
 
+    @cached_property
+    def _redis_sign(self):
+        return _REDIS_SIGN[self.score_type]
+
     def get_redis_score(self, user_score):
         """
         Convert user score to Redis score based on scoring type.
         Redis sorted sets are ordered by score in ascending order,
         so we need to invert scores for highest-wins games.
         """
-        if self.score_type == "lowest" or self.score_type == "time":
-            return user_score
-        # highest
-        # For highest scores, we use negative values so Redis sorts correctly
-        return -user_score
+        return user_score * self._redis_sign
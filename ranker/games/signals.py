@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_game_cache
+from .models import Game
+
+
+@receiver([post_save, post_delete], sender=Game)
+def game_changed(sender, instance, **kwargs):
+    """Invalidate cached game data whenever a game changes."""
+    invalidate_game_cache(instance.pk)
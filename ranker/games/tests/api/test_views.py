@@ -0,0 +1,79 @@
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from ranker.games.api.views import GameViewSet
+from ranker.games.tests.factories import GameFactory
+from ranker.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+class TestGameViewSet:
+    @pytest.fixture
+    def api_rf(self) -> APIRequestFactory:
+        return APIRequestFactory()
+
+    def test_get_queryset_hides_inactive_games(
+        self,
+        user: User,
+        api_rf: APIRequestFactory,
+    ):
+        active = GameFactory(name="Active")
+        inactive = GameFactory(name="Inactive", is_active=False)
+        view = GameViewSet()
+        request = api_rf.get("/fake-url/")
+        request.user = user
+
+        view.request = request
+
+        queryset = view.get_queryset()
+        assert active in queryset
+        assert inactive not in queryset
+
+    def test_get_queryset_shows_inactive_games_to_staff(
+        self,
+        admin_user: User,
+        api_rf: APIRequestFactory,
+    ):
+        inactive = GameFactory(name="Inactive", is_active=False)
+        view = GameViewSet()
+        request = api_rf.get("/fake-url/")
+        request.user = admin_user
+
+        view.request = request
+
+        assert inactive in view.get_queryset()
+
+    def test_active(self, admin_user: User, api_rf: APIRequestFactory):
+        GameFactory(name="B Game")
+        GameFactory(name="A Game")
+        GameFactory(name="Inactive", is_active=False)
+        view = GameViewSet()
+        request = api_rf.get("/fake-url/")
+        request.user = admin_user
+
+        view.request = request
+
+        response = view.active(request)  # type: ignore[call-arg, arg-type, misc]
+
+        assert [game["name"] for game in response.data] == ["A Game", "B Game"]
+
+    def test_active_is_invalidated_on_game_change(
+        self,
+        admin_user: User,
+        api_rf: APIRequestFactory,
+        settings,
+    ):
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        }
+        GameFactory(name="A Game")
+        view = GameViewSet()
+        request = api_rf.get("/fake-url/")
+        request.user = admin_user
+
+        view.request = request
+
+        assert len(view.active(request).data) == 1  # type: ignore[call-arg, arg-type, misc]
+        GameFactory(name="B Game")
+        assert len(view.active(request).data) == 2  # type: ignore[call-arg, arg-type, misc]  # noqa: PLR2004
@@ -0,0 +1,14 @@
+from factory import Sequence
+from factory.django import DjangoModelFactory
+
+from ranker.games.models import Game
+
+
+class GameFactory(DjangoModelFactory[Game]):
+    name = Sequence(lambda n: f"Game {n}")
+    score_type = "highest"
+    is_active = True
+
+    class Meta:
+        model = Game
+        django_get_or_create = ["name"]
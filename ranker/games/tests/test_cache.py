@@ -0,0 +1,58 @@
+import pytest
+
+from ranker.games.cache import get_game_cached
+from ranker.games.cache import get_game_score_type
+from ranker.games.cache import get_game_status
+from ranker.games.tests.factories import GameFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _locmem_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+
+
+def test_get_game_cached(django_assert_num_queries):
+    game = GameFactory(name="Game", score_type="lowest")
+
+    with django_assert_num_queries(1):
+        get_game_cached(game.pk)
+        cached = get_game_cached(game.pk)
+
+    assert cached == game
+    assert cached.name == "Game"
+    assert cached.score_type == "lowest"
+    assert get_game_cached(0) is None
+
+
+def test_get_game_status():
+    active = GameFactory(name="Active")
+    inactive = GameFactory(name="Inactive", is_active=False)
+
+    assert get_game_status(active.pk) is True
+    assert get_game_status(inactive.pk) is False
+    assert get_game_status(0) is None
+
+
+def test_get_game_status_is_invalidated_on_game_change():
+    game = GameFactory(name="Game")
+    assert get_game_status(game.pk) is True
+
+    game.is_active = False
+    game.save()
+
+    assert get_game_status(game.pk) is False
+
+
+def test_get_game_score_type_is_invalidated_on_game_change():
+    game = GameFactory(score_type="time")
+    assert get_game_score_type(game.pk) == "time"
+
+    game.score_type = "lowest"
+    game.save()
+
+    assert get_game_score_type(game.pk) == "lowest"
+    assert get_game_score_type(0) is None
@@ -0,0 +1,21 @@
+import pytest
+
+from ranker.games.models import Game
+
+
+@pytest.mark.parametrize(
+    ("score_type", "expected"),
+    [
+        ("highest", -150),
+        ("lowest", 150),
+        ("time", 150),
+    ],
+)
+def test_get_redis_score(score_type: str, expected: int):
+    game = Game(name="Game", score_type=score_type)
+    assert game.get_redis_score(150) == expected
+
+
+def test_redis_key():
+    game = Game(id=7, name="Game")
+    assert game.redis_key == "leaderboard:7"
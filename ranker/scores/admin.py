@@ -18,7 +18,7 @@ class ScoreAdmin(admin.ModelAdmin):
     ]
 
     list_filter = [
-        "game",
+        ("game", admin.RelatedOnlyFieldListFilter),
         "submitted_at",
         "game__score_type",
     ]
@@ -29,6 +29,11 @@ class ScoreAdmin(admin.ModelAdmin):
         "game__name",
     ]
 
+    autocomplete_fields = [
+        "user",
+        "game",
+    ]
+
     readonly_fields = [
         "submitted_at",
         "view_metadata",
@@ -64,13 +69,10 @@ class ScoreAdmin(admin.ModelAdmin):
 
     def rebuild_leaderboard_for_selected_games(self, request, queryset):
         """Rebuild leaderboards for games related to selected scores."""
-        from .services import LeaderboardService
-
-        game_ids = queryset.values_list("game_id", flat=True).distinct()
-        service = LeaderboardService()
+        from .services import leaderboard_service
 
-        for game_id in game_ids:
-            service.rebuild_leaderboard(game_id)
+        game_ids = list(queryset.values_list("game_id", flat=True).distinct())
+        leaderboard_service.rebuild_leaderboards(game_ids)
 
         self.message_user(
             request,
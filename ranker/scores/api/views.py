@@ -1,20 +1,18 @@
+import uuid
 from datetime import timedelta
 
 from django.db.models import Avg
 from django.db.models import Count
-from django.db.models import F
 from django.db.models import Max
 from django.db.models import Min
 from django.db.models import Q
-from django.db.models.functions import TruncDate
-from django.db.models.functions import TruncHour
-from django.db.models.functions import TruncMonth
-from django.db.models.functions import TruncWeek
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.utils.decorators import method_decorator
 from django_ratelimit.decorators import ratelimit
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.fields import BooleanField
 from rest_framework.mixins import ListModelMixin
 from rest_framework.permissions import IsAdminUser
 from rest_framework.permissions import IsAuthenticated
@@ -22,93 +20,204 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 
-from ranker.games.models import Game
+from ranker.games.cache import get_game_cached
 from ranker.scores.models import Score
-from ranker.scores.services import LeaderboardService
-from ranker.users.models import User
+from ranker.scores.reports import REPORT_PERIODS
+from ranker.scores.reports import claim_report_build
+from ranker.scores.reports import get_cached_report
+from ranker.scores.services import leaderboard_service
+from ranker.scores.tasks import build_game_analytics
+from ranker.scores.tasks import build_leaderboard_trends
+from ranker.scores.tasks import build_scoring_patterns
+from ranker.scores.tasks import build_user_engagement
+from ranker.scores.tasks import submit_score_to_db
 
-from .serializers import GameAnalyticsSerializer
 from .serializers import GlobalLeaderboardEntrySerializer
 from .serializers import LeaderboardEntrySerializer
-from .serializers import LeaderboardTrendsSerializer
 from .serializers import ScoreHistorySerializer
 from .serializers import ScoreSerializer
 from .serializers import ScoreSubmissionSerializer
-from .serializers import ScoringPatternsSerializer
 from .serializers import TopPlayerReportEntrySerializer
-from .serializers import UserEngagementSerializer
 from .serializers import UserRankSerializer
 
+# Shared by ScoreSubmissionView and ScoreViewSet.submit, which count against
+# the same per-user limit
+submit_ratelimit = ratelimit(
+    group="scores.submit",
+    key="user",
+    rate="30/m",
+    method="POST",
+    block=True,
+)
+
+
+def _submit_score(request):
+    """Submit a score for a specific game."""
+    serializer = ScoreSubmissionSerializer(data=request.data)
+
+    if not serializer.is_valid():
+        return Response(
+            serializer.errors,
+            status=status.HTTP_400_BAD_REQUEST,
+        )
 
-@method_decorator(ratelimit(key="user", rate="30/m", method="POST", block=True), name="post")
-class ScoreSubmissionView(APIView):
-    """
-    API endpoint for submitting scores.
-    POST /api/scores/
-    Rate limited to 30 submissions per minute per user.
-    """
+    game_id = serializer.validated_data["game_id"]
+    score_value = serializer.validated_data["score"]
+    metadata = serializer.validated_data.get("metadata", {})
 
-    permission_classes = [IsAuthenticated]
+    game = get_game_cached(game_id)
+    if game is None:
+        return Response(
+            {"error": "Game not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
 
-    def post(self, request):
-        """Submit a score for a specific game."""
-        serializer = ScoreSubmissionSerializer(data=request.data)
+    # Update the leaderboard, check for a personal best and get user's rank
+    rank_info = leaderboard_service.submit_and_get_rank(
+        game_id,
+        request.user.id,
+        float(score_value),
+        game.score_type,
+    )
+
+    response_data = {
+        "message": "Score submitted successfully",
+        "score": score_value,
+        "is_personal_best": rank_info["is_personal_best"],
+        "rank": rank_info["user_rank"],
+        "total_players": rank_info["total_players"],
+    }
+
+    if request.query_params.get("sync") in BooleanField.TRUE_VALUES:
+        # The leaderboard was updated above
+        Score(
+            user=request.user,
+            game=game,
+            score=score_value,
+            metadata=metadata,
+        ).save(update_leaderboard=False)
+        return Response(response_data, status=status.HTTP_201_CREATED)
 
-        if not serializer.is_valid():
-            return Response(
-                serializer.errors,
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+    # Persist the score in the background; the submission id lets the task
+    # skip scores that were already stored if it is retried
+    submission_id = str(uuid.uuid4())
+    submit_score_to_db.delay(
+        request.user.id,
+        game_id,
+        str(score_value),
+        metadata,
+        submission_id,
+    )
+    response_data["submission_id"] = submission_id
+
+    return Response(response_data, status=status.HTTP_202_ACCEPTED)
+
+
+def _score_history(request):
+    """Get user's score history."""
+    game_id = request.query_params.get("game_id")
+
+    if not game_id:
+        return Response(
+            {"error": "game_id parameter is required"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
 
-        game_id = serializer.validated_data["game_id"]
-        score_value = serializer.validated_data["score"]
-        metadata = serializer.validated_data.get("metadata", {})
+    game = get_game_cached(game_id)
+    if game is None:
+        return Response(
+            {"error": "Game not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
 
+    # Get user's score history; the id breaks ties between scores submitted
+    # at the same instant, so the keyset below is unique
+    scores = Score.objects.filter(
+        user=request.user,
+        game=game,
+    ).order_by("-submitted_at", "-id")
+
+    # Pagination
+    page_size = int(request.query_params.get("page_size", 20))
+    page_size = min(page_size, 100)
+    # Only offset pagination reports a page number
+    pagination = {}
+
+    # Keyset pagination: continue from the last submission of the previous
+    # page instead of skipping rows with OFFSET
+    before = request.query_params.get("before")
+    if before:
         try:
-            game = Game.objects.get(id=game_id)
-        except Game.DoesNotExist:
+            before_date = parse_datetime(before)
+        except ValueError:
+            before_date = None
+        if before_date is None:
             return Response(
-                {"error": "Game not found"},
-                status=status.HTTP_404_NOT_FOUND,
+                {"error": "Invalid before. Must be an ISO 8601 datetime"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
+        # A datetime without an offset is read in the current time zone
+        if timezone.is_naive(before_date):
+            before_date = timezone.make_aware(before_date)
+        before_id = request.query_params.get("before_id")
+        if before_id is None:
+            scores = scores.filter(submitted_at__lt=before_date)
+        elif before_id.isdigit():
+            scores = scores.filter(
+                Q(submitted_at__lt=before_date)
+                | Q(submitted_at=before_date, id__lt=before_id),
+            )
+        else:
+            return Response(
+                {"error": "Invalid before_id. Must be a score id"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        start = 0
+    else:
+        page = int(request.query_params.get("page", 1))
+        pagination["page"] = page
+        start = (page - 1) * page_size
 
-        # Create score record
-        score_obj = Score.objects.create(
-            user=request.user,
-            game=game,
-            score=score_value,
-            metadata=metadata,
-        )
-
-        # Get user's rank after submission
-        leaderboard_service = LeaderboardService()
-        rank_info = leaderboard_service.get_user_rank(game_id, request.user.id)
+    # Fetch one extra row to tell whether there is a next page
+    paginated_scores = list(scores[start:start + page_size + 1])
+    has_next = len(paginated_scores) > page_size
+    paginated_scores = paginated_scores[:page_size]
+
+    serializer = ScoreHistorySerializer(paginated_scores, many=True)
+    # The next page starts after the last row of this one
+    next_before = next_before_id = None
+    if has_next:
+        next_before = paginated_scores[-1].submitted_at.isoformat()
+        next_before_id = paginated_scores[-1].id
+
+    return Response({
+        "game_id": game_id,
+        "game_name": game.name,
+        "scores": serializer.data,
+        **pagination,
+        "page_size": page_size,
+        "has_next": has_next,
+        "next_before": next_before,
+        "next_before_id": next_before_id,
+    })
+
+
+@method_decorator(submit_ratelimit, name="post")
+class ScoreSubmissionView(APIView):
+    """
+    API endpoint for submitting scores.
+    POST /api/scores/
+    Rate limited to 30 submissions per minute per user.
 
-        # Check if this is a personal best
-        previous_best = Score.get_user_best_score(request.user, game)
-        is_personal_best = False
+    The leaderboard is updated immediately and the score is stored by a
+    Celery task (202 Accepted). Pass ?sync=1 to store it within the request.
+    """
 
-        if previous_best:
-            if game.score_type == "highest":
-                is_personal_best = score_value > previous_best.score
-            else:  # lowest or time
-                is_personal_best = score_value < previous_best.score
-        else:
-            is_personal_best = True
-
-        response_data = {
-            "message": "Score submitted successfully",
-            "score": score_value,
-            "is_personal_best": is_personal_best,
-        }
-
-        if rank_info:
-            response_data.update({
-                "rank": rank_info["user_rank"],
-                "total_players": rank_info["total_players"],
-            })
+    permission_classes = [IsAuthenticated]
 
-        return Response(response_data, status=status.HTTP_201_CREATED)
+    def post(self, request):
+        """Submit a score for a specific game."""
+        return _submit_score(request)
 
 
 class LeaderboardView(APIView):
@@ -121,9 +230,8 @@ class LeaderboardView(APIView):
 
     def get(self, request, game_id):
         """Get leaderboard for a specific game."""
-        try:
-            game = Game.objects.get(id=game_id)
-        except Game.DoesNotExist:
+        game = get_game_cached(game_id)
+        if game is None:
             return Response(
                 {"error": "Game not found"},
                 status=status.HTTP_404_NOT_FOUND,
@@ -138,7 +246,6 @@ class LeaderboardView(APIView):
         end = start + page_size - 1
 
         # Get leaderboard from Redis
-        leaderboard_service = LeaderboardService()
         leaderboard = leaderboard_service.get_leaderboard(game_id, start, end)
 
         # Serialize the data
@@ -173,7 +280,6 @@ class GlobalLeaderboardView(APIView):
         end = start + page_size - 1
 
         # Get global leaderboard from Redis
-        leaderboard_service = LeaderboardService()
         leaderboard = leaderboard_service.get_global_leaderboard(start, end)
 
         # Serialize the data
@@ -197,15 +303,13 @@ class UserRankView(APIView):
 
     def get(self, request, game_id):
         """Get user's rank and surrounding players."""
-        try:
-            game = Game.objects.get(id=game_id)
-        except Game.DoesNotExist:
+        game = get_game_cached(game_id)
+        if game is None:
             return Response(
                 {"error": "Game not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        leaderboard_service = LeaderboardService()
         rank_info = leaderboard_service.get_user_rank(game_id, request.user.id)
 
         if not rank_info:
@@ -228,48 +332,7 @@ class ScoreHistoryView(APIView):
 
     def get(self, request):
         """Get user's score history."""
-        game_id = request.query_params.get("game_id")
-
-        if not game_id:
-            return Response(
-                {"error": "game_id parameter is required"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        try:
-            game = Game.objects.get(id=game_id)
-        except Game.DoesNotExist:
-            return Response(
-                {"error": "Game not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        # Get user's score history
-        scores = Score.objects.filter(
-            user=request.user,
-            game=game,
-        ).order_by("-submitted_at")
-
-        # Pagination
-        page = int(request.query_params.get("page", 1))
-        page_size = int(request.query_params.get("page_size", 20))
-        page_size = min(page_size, 100)
-
-        start = (page - 1) * page_size
-        end = start + page_size
-
-        paginated_scores = scores[start:end]
-
-        serializer = ScoreHistorySerializer(paginated_scores, many=True)
-
-        return Response({
-            "game_id": game_id,
-            "game_name": game.name,
-            "scores": serializer.data,
-            "page": page,
-            "page_size": page_size,
-            "has_next": len(paginated_scores) == page_size,
-        })
+        return _score_history(request)
 
 
 class TopPlayersReportView(APIView):
@@ -305,14 +368,13 @@ class TopPlayersReportView(APIView):
         query = Q(submitted_at__gte=start_date)
 
         if game_id:
-            try:
-                game = Game.objects.get(id=game_id)
-                query &= Q(game=game)
-            except Game.DoesNotExist:
+            game = get_game_cached(game_id)
+            if game is None:
                 return Response(
                     {"error": "Game not found"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
+            query &= Q(game=game)
 
         # Get top players statistics
         top_players = (
@@ -355,6 +417,21 @@ class TopPlayersReportView(APIView):
         })
 
 
+def _report_response(report, task, *args):
+    """Serve a cached report, or enqueue a build of it and answer 202."""
+    payload = get_cached_report(report, *args)
+    if payload is not None:
+        return Response(payload)
+
+    if claim_report_build(report, *args):
+        task.delay(*args)
+
+    return Response(
+        {"message": "Report is being generated, try again shortly"},
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
 class GameAnalyticsView(APIView):
     """
     Advanced analytics for game performance and statistics.
@@ -364,90 +441,23 @@ class GameAnalyticsView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        """Generate comprehensive game analytics."""
+        """Serve the cached game analytics report."""
         period = request.query_params.get("period", "weekly")
         game_id = request.query_params.get("game_id")
 
-        # Calculate date range
-        now = timezone.now()
-        if period == "daily":
-            start_date = now - timedelta(days=7)  # Last 7 days for daily view
-            trunc_func = TruncDate
-        elif period == "weekly":
-            start_date = now - timedelta(weeks=12)  # Last 12 weeks
-            trunc_func = TruncWeek
-        elif period == "monthly":
-            start_date = now - timedelta(days=365)  # Last year
-            trunc_func = TruncMonth
-        else:
+        if period not in REPORT_PERIODS:
             return Response(
                 {"error": "Invalid period. Must be daily, weekly, or monthly"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        query = Q(submitted_at__gte=start_date)
-        if game_id:
-            try:
-                game = Game.objects.get(id=game_id)
-                query &= Q(game=game)
-            except Game.DoesNotExist:
-                return Response(
-                    {"error": "Game not found"},
-                    status=status.HTTP_404_NOT_FOUND,
-                )
-
-        # Game performance metrics
-        games_stats = (
-            Score.objects.filter(query)
-            .values("game__id", "game__name", "game__score_type")
-            .annotate(
-                total_plays=Count("id"),
-                unique_players=Count("user", distinct=True),
-                avg_score=Avg("score"),
-                max_score=Max("score"),
-                min_score=Min("score"),
-                score_range=F("max_score") - F("min_score"),
-                first_play=Min("submitted_at"),
-                last_play=Max("submitted_at"),
+        if game_id and get_game_cached(game_id) is None:
+            return Response(
+                {"error": "Game not found"},
+                status=status.HTTP_404_NOT_FOUND,
             )
-            .order_by("-total_plays")
-        )
 
-        # Trending data over time
-        trending_data = (
-            Score.objects.filter(query)
-            .annotate(period=trunc_func("submitted_at"))
-            .values("period")
-            .annotate(
-                total_submissions=Count("id"),
-                unique_players=Count("user", distinct=True),
-                avg_score=Avg("score"),
-            )
-            .order_by("period")
-        )
-
-        # Score distribution analysis
-        score_distribution = (
-            Score.objects.filter(query)
-            .aggregate(
-                total_scores=Count("id"),
-                percentile_25=Min("score"),  # Simplified - would need proper percentile calc
-                percentile_50=Avg("score"),
-                percentile_75=Max("score"),
-                std_deviation=Avg("score"),  # Simplified
-            )
-        )
-
-        serializer = GameAnalyticsSerializer({
-            "period": period,
-            "start_date": start_date,
-            "end_date": now,
-            "games_performance": games_stats,
-            "trending_data": trending_data,
-            "score_distribution": score_distribution,
-        })
-
-        return Response(serializer.data)
+        return _report_response("game_analytics", build_game_analytics, period, game_id)
 
 
 class UserEngagementView(APIView):
@@ -459,89 +469,16 @@ class UserEngagementView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        """Generate user engagement analytics."""
+        """Serve the cached user engagement report."""
         period = request.query_params.get("period", "weekly")
 
-        # Calculate date range
-        now = timezone.now()
-        if period == "daily":
-            start_date = now - timedelta(days=30)
-            trunc_func = TruncDate
-        elif period == "weekly":
-            start_date = now - timedelta(weeks=12)
-            trunc_func = TruncWeek
-        elif period == "monthly":
-            start_date = now - timedelta(days=365)
-            trunc_func = TruncMonth
-        else:
+        if period not in REPORT_PERIODS:
             return Response(
                 {"error": "Invalid period. Must be daily, weekly, or monthly"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # User activity metrics
-        user_activity = (
-            Score.objects.filter(submitted_at__gte=start_date)
-            .values("user__id", "user__email", "user__name")
-            .annotate(
-                total_sessions=Count("id"),
-                games_played=Count("game", distinct=True),
-                avg_score=Avg("score"),
-                best_score=Max("score"),
-                first_activity=Min("submitted_at"),
-                last_activity=Max("submitted_at"),
-                activity_span_days=(Max("submitted_at") - Min("submitted_at")),
-                sessions_per_day=Count("id") / (Max("submitted_at") - Min("submitted_at")).total_seconds() * 86400,
-            )
-            .order_by("-total_sessions")[:50]  # Top 50 most active users
-        )
-
-        # Engagement trends over time
-        engagement_trends = (
-            Score.objects.filter(submitted_at__gte=start_date)
-            .annotate(period=trunc_func("submitted_at"))
-            .values("period")
-            .annotate(
-                active_users=Count("user", distinct=True),
-                total_sessions=Count("id"),
-                avg_session_length=Avg("metadata__time_played"),  # If available in metadata
-                retention_rate=Count("user", distinct=True),  # Simplified metric
-            )
-            .order_by("period")
-        )
-
-        # New vs returning users
-        new_vs_returning = []
-        for days_ago in range(7):
-            date = now - timedelta(days=days_ago)
-            date_start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-            date_end = date_start + timedelta(days=1)
-
-            daily_users = User.objects.filter(
-                scores__submitted_at__gte=date_start,
-                scores__submitted_at__lt=date_end,
-            ).distinct()
-
-            new_users = daily_users.filter(date_joined__gte=date_start)
-            returning_users = daily_users.exclude(date_joined__gte=date_start)
-
-            new_vs_returning.append({
-                "date": date_start.date(),
-                "new_users": new_users.count(),
-                "returning_users": returning_users.count(),
-                "total_users": daily_users.count(),
-            })
-
-        serializer = UserEngagementSerializer({
-            "period": period,
-            "start_date": start_date,
-            "end_date": now,
-            "user_activity": user_activity,
-            "engagement_trends": engagement_trends,
-            "new_vs_returning": new_vs_returning,
-        })
-
-        return Response(serializer.data)
+        return _report_response("user_engagement", build_user_engagement, period)
 
 
 class LeaderboardTrendsView(APIView):
@@ -553,7 +490,7 @@ class LeaderboardTrendsView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        """Generate leaderboard trends analysis."""
+        """Serve the cached leaderboard trends report."""
         game_id = request.query_params.get("game_id")
         period = request.query_params.get("period", "weekly")
 
@@ -563,85 +500,25 @@ class LeaderboardTrendsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        try:
-            game = Game.objects.get(id=game_id)
-        except Game.DoesNotExist:
+        if get_game_cached(game_id) is None:
             return Response(
                 {"error": "Game not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Calculate date range
-        now = timezone.now()
-        if period == "daily":
-            start_date = now - timedelta(days=30)
-        elif period == "weekly":
-            start_date = now - timedelta(weeks=12)
-        elif period == "monthly":
-            start_date = now - timedelta(days=365)
-        else:
+        if period not in REPORT_PERIODS:
             return Response(
                 {"error": "Invalid period. Must be daily, weekly, or monthly"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Get current Redis leaderboard
-        leaderboard_service = LeaderboardService()
-        current_leaderboard = leaderboard_service.get_leaderboard(game_id, 0, 99)
-
-        # Historical score progression for top players
-        top_user_ids = [player["user_id"] for player in current_leaderboard[:10]]
-
-        score_progression = []
-        for user_id in top_user_ids:
-            user_scores = (
-                Score.objects.filter(
-                    user_id=user_id,
-                    game=game,
-                    submitted_at__gte=start_date,
-                )
-                .order_by("submitted_at")
-                .values("submitted_at", "score")
-            )
-
-            if user_scores:
-                user = User.objects.get(id=user_id)
-                score_progression.append({
-                    "user_id": user_id,
-                    "username": user.email,
-                    "name": user.name or user.email,
-                    "score_history": list(user_scores),
-                    "improvement": (
-                        list(user_scores)[-1]["score"] - list(user_scores)[0]["score"]
-                        if len(user_scores) > 1 else 0
-                    ),
-                })
-
-        # Competition intensity metrics
-        competition_metrics = (
-            Score.objects.filter(game=game, submitted_at__gte=start_date)
-            .aggregate(
-                total_participants=Count("user", distinct=True),
-                score_submissions=Count("id"),
-                avg_submissions_per_user=Count("id") / Count("user", distinct=True),
-                score_range=Max("score") - Min("score"),
-                leaderboard_volatility=Count("user", distinct=True),  # Simplified
-            )
+        return _report_response(
+            "leaderboard_trends",
+            build_leaderboard_trends,
+            period,
+            game_id,
         )
 
-        serializer = LeaderboardTrendsSerializer({
-            "game_id": game_id,
-            "game_name": game.name,
-            "period": period,
-            "start_date": start_date,
-            "end_date": now,
-            "current_leaderboard": current_leaderboard[:10],
-            "score_progression": score_progression,
-            "competition_metrics": competition_metrics,
-        })
-
-        return Response(serializer.data)
-
 
 class ScoringPatternsView(APIView):
     """
@@ -652,102 +529,23 @@ class ScoringPatternsView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        """Generate scoring patterns analysis."""
+        """Serve the cached scoring patterns report."""
         period = request.query_params.get("period", "weekly")
         game_id = request.query_params.get("game_id")
 
-        # Calculate date range
-        now = timezone.now()
-        if period == "daily":
-            start_date = now - timedelta(days=7)
-        elif period == "weekly":
-            start_date = now - timedelta(weeks=4)
-        elif period == "monthly":
-            start_date = now - timedelta(days=90)
-        else:
+        if period not in REPORT_PERIODS:
             return Response(
                 {"error": "Invalid period. Must be daily, weekly, or monthly"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        query = Q(submitted_at__gte=start_date)
-        if game_id:
-            query &= Q(game_id=game_id)
-
-        # Peak activity hours
-        peak_hours = (
-            Score.objects.filter(query)
-            .annotate(hour=TruncHour("submitted_at"))
-            .values("hour")
-            .annotate(submissions=Count("id"))
-            .order_by("-submissions")[:24]
-        )
-
-        # Score improvement patterns
-        improvement_patterns = []
-        active_users = (
-            Score.objects.filter(query)
-            .values_list("user_id", flat=True)
-            .distinct()
-        )
-
-        for user_id in list(active_users)[:20]:  # Top 20 for performance
-            user_scores = (
-                Score.objects.filter(user_id=user_id, submitted_at__gte=start_date)
-                .order_by("submitted_at")
-                .values_list("score", flat=True)
-            )
-
-            if len(user_scores) > 1:
-                scores_list = list(user_scores)
-                improvement_pattern = {
-                    "user_id": user_id,
-                    "total_sessions": len(scores_list),
-                    "starting_score": scores_list[0],
-                    "ending_score": scores_list[-1],
-                    "improvement": scores_list[-1] - scores_list[0],
-                    "consistency": len([s for s in scores_list if s >= scores_list[0]]) / len(scores_list),
-                    "peak_score": max(scores_list),
-                }
-                improvement_patterns.append(improvement_pattern)
-
-        # Metadata analysis (if available)
-        metadata_patterns = (
-            Score.objects.filter(query)
-            .exclude(metadata={})
-            .values("metadata__difficulty", "metadata__level")
-            .annotate(
-                avg_score=Avg("score"),
-                count=Count("id"),
-            )
-            .order_by("-count")[:10]
+        return _report_response(
+            "scoring_patterns",
+            build_scoring_patterns,
+            period,
+            game_id,
         )
 
-        # Submission frequency patterns
-        frequency_patterns = (
-            Score.objects.filter(query)
-            .values("user_id")
-            .annotate(
-                submission_count=Count("id"),
-                days_active=Count("submitted_at__date", distinct=True),
-                avg_daily_submissions=Count("id") / Count("submitted_at__date", distinct=True),
-            )
-            .filter(submission_count__gte=5)  # Users with at least 5 submissions
-            .order_by("-avg_daily_submissions")[:20]
-        )
-
-        serializer = ScoringPatternsSerializer({
-            "period": period,
-            "start_date": start_date,
-            "end_date": now,
-            "peak_activity_hours": peak_hours,
-            "improvement_patterns": improvement_patterns,
-            "metadata_patterns": metadata_patterns,
-            "frequency_patterns": frequency_patterns,
-        })
-
-        return Response(serializer.data)
-
 
 class ScoreViewSet(ListModelMixin, GenericViewSet):
     """
@@ -759,18 +557,19 @@ class ScoreViewSet(ListModelMixin, GenericViewSet):
 
     def get_queryset(self):
         """Get scores for the current user."""
-        return Score.objects.filter(user=self.request.user).select_related("game")
+        # ScoreSerializer nests both the user and the game
+        return Score.objects.filter(user=self.request.user).select_related(
+            "user",
+            "game",
+        )
 
     @action(detail=False, methods=["post"])
+    @method_decorator(submit_ratelimit)
     def submit(self, request):
-        """Submit a score - delegated to ScoreSubmissionView."""
-        view = ScoreSubmissionView()
-        view.request = request
-        return view.post(request)
+        """Submit a score - same as ScoreSubmissionView."""
+        return _submit_score(request)
 
     @action(detail=False, methods=["get"])
     def history(self, request):
-        """Get score history - delegated to ScoreHistoryView."""
-        view = ScoreHistoryView()
-        view.request = request
-        return view.get(request)
+        """Get score history - same as ScoreHistoryView."""
+        return _score_history(request)
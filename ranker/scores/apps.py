@@ -11,3 +11,4 @@ class ScoresConfig(AppConfig):
 
     def ready(self):
         """Run when the app is ready."""
+        import ranker.scores.signals  # noqa: F401, PLC0415
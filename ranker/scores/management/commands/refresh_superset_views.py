@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from ranker.scores.superset import SUPERSET_VIEWS
+from ranker.scores.superset import refresh_superset_views
+
+
+class Command(BaseCommand):
+    help = "Refresh the Apache Superset materialized views"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "views",
+            nargs="*",
+            help="Views to refresh (default: all)",
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options["views"]) - set(SUPERSET_VIEWS)
+        if unknown:
+            msg = f"Unknown Superset views: {', '.join(sorted(unknown))}"
+            raise CommandError(msg)
+
+        refreshed = refresh_superset_views(options["views"] or SUPERSET_VIEWS)
+
+        for view_name in refreshed:
+            self.stdout.write(f"  ✓ Refreshed {view_name}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Refreshed {len(refreshed)} Superset views"),
+        )
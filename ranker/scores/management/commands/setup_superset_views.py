@@ -1,403 +1,443 @@
 import logging
+from collections import defaultdict
 
 from django.core.management.base import BaseCommand
 from django.db import connection
+from django.db import transaction
 
-logger = logging.getLogger(__name__)
-
-
-class Command(BaseCommand):
-    help = "Set up database views for Apache Superset analytics and dashboards"
-
-    def add_arguments(self, parser):
-        parser.add_argument(
-            "--drop-existing",
-            action="store_true",
-            help="Drop existing views before creating new ones",
-        )
-
-    def handle(self, *args, **options):
-        self.stdout.write(self.style.SUCCESS("Setting up Apache Superset database views..."))
+from ranker.scores.superset import DAY_NAME_SQL
+from ranker.scores.superset import SCORING_PATTERNS_SELECT
+from ranker.scores.superset import get_expected_kind
+from ranker.scores.superset import get_view_kinds
+from ranker.scores.superset import refresh_scoring_patterns
+from ranker.scores.superset import score_is_better_sql
 
-        if options["drop_existing"]:
-            self.drop_existing_views()
-
-        # Create all views
-        self.create_game_analytics_view()
-        self.create_user_engagement_view()
-        self.create_leaderboard_trends_view()
-        self.create_scoring_patterns_view()
-        self.create_daily_metrics_view()
-        self.create_user_performance_view()
-        self.create_game_popularity_view()
-
-        self.stdout.write(self.style.SUCCESS("✅ All Superset views created successfully!"))
-        self.show_views_summary()
-
-    def drop_existing_views(self):
-        """Drop existing views."""
-        self.stdout.write("Dropping existing views...")
-
-        views_to_drop = [
-            "superset_game_analytics",
-            "superset_user_engagement",
-            "superset_leaderboard_trends",
-            "superset_scoring_patterns",
-            "superset_daily_metrics",
-            "superset_user_performance",
-            "superset_game_popularity",
-        ]
-
-        with connection.cursor() as cursor:
-            for view_name in views_to_drop:
-                try:
-                    cursor.execute(f"DROP VIEW IF EXISTS {view_name} CASCADE;")
-                    self.stdout.write(f"  ✓ Dropped {view_name}")
-                except Exception as e:
-                    self.stdout.write(f"  ⚠️  Could not drop {view_name}: {e}")
-
-    def create_game_analytics_view(self):
-        """Create game analytics view for Superset."""
-        self.stdout.write("Creating game analytics view...")
-
-        sql = """
-        CREATE OR REPLACE VIEW superset_game_analytics AS
-        SELECT
-            g.id as game_id,
-            g.name as game_name,
-            g.score_type,
-            g.is_active,
-            g.created_at as game_created_at,
-            COUNT(s.id) as total_submissions,
-            COUNT(DISTINCT s.user_id) as unique_players,
-            AVG(s.score) as avg_score,
-            MAX(s.score) as max_score,
-            MIN(s.score) as min_score,
-            STDDEV(s.score) as score_stddev,
-            MAX(s.score) - MIN(s.score) as score_range,
-            MIN(s.submitted_at) as first_submission,
-            MAX(s.submitted_at) as last_submission,
-            EXTRACT(EPOCH FROM (MAX(s.submitted_at) - MIN(s.submitted_at)))/86400 as activity_days,
-            COUNT(s.id)::float / NULLIF(COUNT(DISTINCT s.user_id), 0) as submissions_per_player,
-            COUNT(s.id)::float / NULLIF(EXTRACT(EPOCH FROM (MAX(s.submitted_at) - MIN(s.submitted_at)))/86400, 0) as submissions_per_day
-        FROM games_game g
-        LEFT JOIN scores_score s ON g.id = s.game_id
-        GROUP BY g.id, g.name, g.score_type, g.is_active, g.created_at
-        ORDER BY total_submissions DESC;
-        """
-
-        with connection.cursor() as cursor:
-            cursor.execute(sql)
-
-        self.stdout.write("  ✓ Game analytics view created")
-
-    def create_user_engagement_view(self):
-        """Create user engagement view for Superset."""
-        self.stdout.write("Creating user engagement view...")
+logger = logging.getLogger(__name__)
 
-        sql = """
-        CREATE OR REPLACE VIEW superset_user_engagement AS
+# pg_class relkind to the DROP statement for it
+DROP_KINDS = {"v": "VIEW", "m": "MATERIALIZED VIEW", "r": "TABLE"}
+
+GAME_ANALYTICS_SQL = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS superset_game_analytics AS
+    SELECT
+        g.id as game_id,
+        g.name as game_name,
+        g.score_type,
+        g.is_active,
+        g.created_at as game_created_at,
+        COUNT(s.id) as total_submissions,
+        COUNT(DISTINCT s.user_id) as unique_players,
+        AVG(s.score::float8) as avg_score,
+        MAX(s.score) as max_score,
+        MIN(s.score) as min_score,
+        STDDEV(s.score::float8) as score_stddev,
+        MAX(s.score) - MIN(s.score) as score_range,
+        MIN(s.submitted_at) as first_submission,
+        MAX(s.submitted_at) as last_submission,
+        EXTRACT(EPOCH FROM (MAX(s.submitted_at) - MIN(s.submitted_at)))/86400 as activity_days,
+        COUNT(s.id)::float / NULLIF(COUNT(DISTINCT s.user_id), 0) as submissions_per_player,
+        COUNT(s.id)::float / NULLIF(EXTRACT(EPOCH FROM (MAX(s.submitted_at) - MIN(s.submitted_at)))/86400, 0) as submissions_per_day
+    FROM games_game g
+    LEFT JOIN scores_score s ON g.id = s.game_id
+    GROUP BY g.id, g.name, g.score_type, g.is_active, g.created_at
+    ORDER BY total_submissions DESC;
+
+    CREATE UNIQUE INDEX IF NOT EXISTS superset_game_analytics_key
+        ON superset_game_analytics (game_id);
+"""
+
+USER_ENGAGEMENT_SQL = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS superset_user_engagement AS
+    SELECT
+        u.id as user_id,
+        u.email as user_email,
+        u.name as user_name,
+        u.date_joined,
+        u.is_active as user_is_active,
+        COUNT(s.id) as total_submissions,
+        COUNT(DISTINCT s.game_id) as games_played,
+        AVG(s.score::float8) as avg_score,
+        MAX(s.score) as best_score,
+        MIN(s.score) as worst_score,
+        MIN(s.submitted_at) as first_submission,
+        MAX(s.submitted_at) as last_submission,
+        EXTRACT(EPOCH FROM (MAX(s.submitted_at) - MIN(s.submitted_at)))/86400 as activity_span_days,
+        COUNT(DISTINCT DATE(s.submitted_at)) as active_days,
+        COUNT(s.id)::float / NULLIF(COUNT(DISTINCT DATE(s.submitted_at)), 0) as submissions_per_active_day,
+        CASE
+            WHEN MAX(s.submitted_at) >= NOW() - INTERVAL '7 days' THEN 'Active'
+            WHEN MAX(s.submitted_at) >= NOW() - INTERVAL '30 days' THEN 'Recent'
+            ELSE 'Inactive'
+        END as user_status,
+        EXTRACT(EPOCH FROM (NOW() - MAX(s.submitted_at)))/86400 as days_since_last_activity
+    FROM users_user u
+    LEFT JOIN scores_score s ON u.id = s.user_id
+    GROUP BY u.id, u.email, u.name, u.date_joined, u.is_active
+    ORDER BY total_submissions DESC;
+
+    CREATE UNIQUE INDEX IF NOT EXISTS superset_user_engagement_key
+        ON superset_user_engagement (user_id);
+"""
+
+# Interpolates score_is_better_sql() over constant column names only
+LEADERBOARD_TRENDS_SQL = f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS superset_leaderboard_trends AS
+    WITH bucketed_scores AS (
+        -- Decompose each timestamp once for the windows and columns below
         SELECT
-            u.id as user_id,
-            u.email as user_email,
-            u.name as user_name,
-            u.date_joined,
-            u.is_active as user_is_active,
-            COUNT(s.id) as total_submissions,
-            COUNT(DISTINCT s.game_id) as games_played,
-            AVG(s.score) as avg_score,
-            MAX(s.score) as best_score,
-            MIN(s.score) as worst_score,
-            MIN(s.submitted_at) as first_submission,
-            MAX(s.submitted_at) as last_submission,
-            EXTRACT(EPOCH FROM (MAX(s.submitted_at) - MIN(s.submitted_at)))/86400 as activity_span_days,
-            COUNT(DISTINCT DATE(s.submitted_at)) as active_days,
-            COUNT(s.id)::float / NULLIF(COUNT(DISTINCT DATE(s.submitted_at)), 0) as submissions_per_active_day,
-            CASE
-                WHEN MAX(s.submitted_at) >= NOW() - INTERVAL '7 days' THEN 'Active'
-                WHEN MAX(s.submitted_at) >= NOW() - INTERVAL '30 days' THEN 'Recent'
-                ELSE 'Inactive'
-            END as user_status,
-            EXTRACT(EPOCH FROM (NOW() - MAX(s.submitted_at)))/86400 as days_since_last_activity
-        FROM users_user u
-        LEFT JOIN scores_score s ON u.id = s.user_id
-        GROUP BY u.id, u.email, u.name, u.date_joined, u.is_active
-        ORDER BY total_submissions DESC;
-        """
-
-        with connection.cursor() as cursor:
-            cursor.execute(sql)
-
-        self.stdout.write("  ✓ User engagement view created")
-
-    def create_leaderboard_trends_view(self):
-        """Create leaderboard trends view for Superset."""
-        self.stdout.write("Creating leaderboard trends view...")
-
-        sql = """
-        CREATE OR REPLACE VIEW superset_leaderboard_trends AS
+            s.*,
+            DATE(s.submitted_at) as submission_date,
+            EXTRACT(HOUR FROM s.submitted_at)::int as submission_hour,
+            EXTRACT(DOW FROM s.submitted_at)::int as day_of_week,
+            EXTRACT(WEEK FROM s.submitted_at)::int as week_number,
+            EXTRACT(MONTH FROM s.submitted_at)::int as month
+        FROM scores_score s
+    ),
+    ranked_scores AS (
+        -- Each window is evaluated once and reused by the outer query
         SELECT
+            s.id,
             s.game_id,
             g.name as game_name,
             g.score_type,
             s.user_id,
-            u.email as user_email,
-            u.name as user_name,
             s.score,
             s.submitted_at,
-            DATE(s.submitted_at) as submission_date,
-            EXTRACT(HOUR FROM s.submitted_at) as submission_hour,
-            EXTRACT(DOW FROM s.submitted_at) as day_of_week,
-            EXTRACT(WEEK FROM s.submitted_at) as week_number,
-            EXTRACT(MONTH FROM s.submitted_at) as month,
-            RANK() OVER (PARTITION BY s.game_id, DATE(s.submitted_at) ORDER BY
+            s.submission_date,
+            s.submission_hour,
+            s.day_of_week,
+            s.week_number,
+            s.month,
+            RANK() OVER (PARTITION BY s.game_id, s.submission_date ORDER BY
                 CASE WHEN g.score_type = 'highest' THEN s.score END DESC,
                 CASE WHEN g.score_type IN ('lowest', 'time') THEN s.score END ASC
             ) as daily_rank,
-            ROW_NUMBER() OVER (PARTITION BY s.user_id, s.game_id ORDER BY s.submitted_at) as user_submission_sequence,
-            LAG(s.score) OVER (PARTITION BY s.user_id, s.game_id ORDER BY s.submitted_at) as previous_score,
-            s.score - LAG(s.score) OVER (PARTITION BY s.user_id, s.game_id ORDER BY s.submitted_at) as score_improvement,
-            CASE
-                WHEN LAG(s.score) OVER (PARTITION BY s.user_id, s.game_id ORDER BY s.submitted_at) IS NULL THEN 'First'
-                WHEN (g.score_type = 'highest' AND s.score > LAG(s.score) OVER (PARTITION BY s.user_id, s.game_id ORDER BY s.submitted_at)) THEN 'Better'
-                WHEN (g.score_type IN ('lowest', 'time') AND s.score < LAG(s.score) OVER (PARTITION BY s.user_id, s.game_id ORDER BY s.submitted_at)) THEN 'Better'
-                WHEN s.score = LAG(s.score) OVER (PARTITION BY s.user_id, s.game_id ORDER BY s.submitted_at) THEN 'Same'
-                ELSE 'Worse'
-            END as performance_trend
-        FROM scores_score s
+            ROW_NUMBER() OVER user_history as user_submission_sequence,
+            LAG(s.score) OVER user_history as previous_score
+        FROM bucketed_scores s
         JOIN games_game g ON s.game_id = g.id
-        JOIN users_user u ON s.user_id = u.id
-        ORDER BY s.submitted_at DESC;
-        """
-
-        with connection.cursor() as cursor:
-            cursor.execute(sql)
-
-        self.stdout.write("  ✓ Leaderboard trends view created")
-
-    def create_scoring_patterns_view(self):
-        """Create scoring patterns view for Superset."""
-        self.stdout.write("Creating scoring patterns view...")
-
-        sql = """
-        CREATE OR REPLACE VIEW superset_scoring_patterns AS
+        WINDOW user_history AS (
+            PARTITION BY s.user_id, s.game_id ORDER BY s.submitted_at
+        )
+    )
+    SELECT
+        rs.id as score_id,
+        rs.game_id,
+        rs.game_name,
+        rs.score_type,
+        rs.user_id,
+        u.email as user_email,
+        u.name as user_name,
+        rs.score,
+        rs.submitted_at,
+        rs.submission_date,
+        rs.submission_hour,
+        rs.day_of_week,
+        rs.week_number,
+        rs.month,
+        rs.daily_rank,
+        rs.user_submission_sequence,
+        rs.previous_score,
+        rs.score - rs.previous_score as score_improvement,
+        CASE
+            WHEN rs.previous_score IS NULL THEN 'First'
+            WHEN {score_is_better_sql(
+                "rs.score", "rs.previous_score", "rs.score_type",
+            )} THEN 'Better'
+            WHEN rs.score = rs.previous_score THEN 'Same'
+            ELSE 'Worse'
+        END as performance_trend
+    FROM ranked_scores rs
+    JOIN users_user u ON rs.user_id = u.id
+    ORDER BY rs.submitted_at DESC;
+
+    CREATE UNIQUE INDEX IF NOT EXISTS superset_leaderboard_trends_key
+        ON superset_leaderboard_trends (score_id);
+"""  # noqa: S608
+
+# A table rather than a materialized view, so that refreshes only recompute
+# the latest hour buckets. It is created empty and filled by the first refresh.
+SCORING_PATTERNS_SQL = f"""
+    CREATE TABLE IF NOT EXISTS superset_scoring_patterns AS
+    {SCORING_PATTERNS_SELECT % {"since": "'infinity'"}}
+    WITH NO DATA;
+
+    CREATE UNIQUE INDEX IF NOT EXISTS superset_scoring_patterns_key
+        ON superset_scoring_patterns (hour_bucket, game_id);
+"""
+
+# Interpolates the constant DAY_NAME_SQL fragment only
+DAILY_METRICS_SQL = f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS superset_daily_metrics AS
+    WITH first_play AS (
         SELECT
-            DATE_TRUNC('hour', s.submitted_at) as hour_bucket,
+            user_id,
+            game_id,
+            MIN(submitted_at) as first_submitted_at
+        FROM scores_score
+        GROUP BY user_id, game_id
+    ),
+    bucketed_scores AS (
+        -- Decompose each timestamp once for the grouping and labels below
+        SELECT
+            s.*,
             DATE(s.submitted_at) as submission_date,
-            EXTRACT(HOUR FROM s.submitted_at) as hour_of_day,
-            EXTRACT(DOW FROM s.submitted_at) as day_of_week,
-            CASE EXTRACT(DOW FROM s.submitted_at)
-                WHEN 0 THEN 'Sunday'
-                WHEN 1 THEN 'Monday'
-                WHEN 2 THEN 'Tuesday'
-                WHEN 3 THEN 'Wednesday'
-                WHEN 4 THEN 'Thursday'
-                WHEN 5 THEN 'Friday'
-                WHEN 6 THEN 'Saturday'
-            END as day_name,
-            CASE
-                WHEN EXTRACT(HOUR FROM s.submitted_at) BETWEEN 6 AND 11 THEN 'Morning'
-                WHEN EXTRACT(HOUR FROM s.submitted_at) BETWEEN 12 AND 17 THEN 'Afternoon'
-                WHEN EXTRACT(HOUR FROM s.submitted_at) BETWEEN 18 AND 23 THEN 'Evening'
-                ELSE 'Night'
-            END as time_period,
+            EXTRACT(DOW FROM s.submitted_at)::int as day_of_week,
+            fp.user_id IS NOT NULL as is_first_play
+        FROM scores_score s
+        LEFT JOIN first_play fp
+            ON fp.user_id = s.user_id
+            AND fp.game_id = s.game_id
+            AND fp.first_submitted_at = s.submitted_at
+    )
+    SELECT
+        -- 'day' rows are per date, 'day_of_week' rows roll up each weekday
+        CASE
+            WHEN GROUPING(s.submission_date) = 0 THEN 'day' ELSE 'day_of_week'
+        END as rollup_level,
+        s.submission_date as metric_date,
+        COUNT(*) as total_submissions,
+        COUNT(DISTINCT s.user_id) as daily_active_users,
+        COUNT(DISTINCT s.game_id) as games_with_activity,
+        AVG(s.score::float8) as avg_score,
+        COUNT(DISTINCT s.user_id) FILTER (
+            WHERE u.date_joined::date = s.submission_date
+        ) as new_users_active,
+        COUNT(DISTINCT s.user_id) FILTER (
+            WHERE u.date_joined::date < s.submission_date
+        ) as returning_users_active,
+        COUNT(*) / COUNT(DISTINCT s.user_id) as avg_submissions_per_user,
+        MAX(s.score) as daily_high_score,
+        COUNT(DISTINCT s.user_id) FILTER (
+            WHERE s.is_first_play
+        ) as new_players_to_games,
+        s.day_of_week,
+        {DAY_NAME_SQL} as day_name,
+        CASE
+            WHEN s.day_of_week IN (0, 6) THEN 'Weekend'
+            ELSE 'Weekday'
+        END as day_type
+    FROM bucketed_scores s
+    JOIN users_user u ON s.user_id = u.id
+    GROUP BY GROUPING SETS ((s.submission_date, s.day_of_week), (s.day_of_week))
+    ORDER BY rollup_level, metric_date DESC, day_of_week;
+
+    CREATE UNIQUE INDEX IF NOT EXISTS superset_daily_metrics_key
+        ON superset_daily_metrics (metric_date, day_of_week);
+"""  # noqa: S608
+
+# Interpolates score_is_better_sql() over constant column names only
+USER_PERFORMANCE_SQL = f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS superset_user_performance AS
+    WITH first_scores AS (
+        SELECT DISTINCT ON (user_id, game_id)
+            user_id,
+            game_id,
+            score as first_score
+        FROM scores_score
+        ORDER BY user_id, game_id, submitted_at, id
+    ),
+    latest_scores AS (
+        SELECT DISTINCT ON (user_id, game_id)
+            user_id,
+            game_id,
+            score as latest_score
+        FROM scores_score
+        ORDER BY user_id, game_id, submitted_at DESC, id DESC
+    ),
+    user_stats AS (
+        SELECT
+            s.user_id,
             s.game_id,
+            u.email as user_email,
+            u.name as user_name,
             g.name as game_name,
             g.score_type,
-            COUNT(*) as submission_count,
-            COUNT(DISTINCT s.user_id) as unique_users,
-            AVG(s.score) as avg_score,
-            MAX(s.score) as max_score,
-            MIN(s.score) as min_score,
-            STDDEV(s.score) as score_stddev,
-            COALESCE(AVG((s.metadata->>'level')::int), 0) as avg_level,
-            COALESCE(AVG((s.metadata->>'time_played')::int), 0) as avg_time_played,
-            COUNT(*) FILTER (WHERE s.metadata->>'difficulty' = 'easy') as easy_count,
-            COUNT(*) FILTER (WHERE s.metadata->>'difficulty' = 'medium') as medium_count,
-            COUNT(*) FILTER (WHERE s.metadata->>'difficulty' = 'hard') as hard_count
+            COUNT(*) as total_attempts,
+            CASE WHEN g.score_type = 'highest' THEN MAX(s.score) ELSE MIN(s.score) END as best_score,
+            CASE WHEN g.score_type = 'highest' THEN MIN(s.score) ELSE MAX(s.score) END as worst_score,
+            AVG(s.score::float8) as avg_score,
+            STDDEV(s.score::float8) as score_consistency,
+            MIN(s.submitted_at) as first_attempt,
+            MAX(s.submitted_at) as last_attempt
         FROM scores_score s
+        JOIN users_user u ON s.user_id = u.id
         JOIN games_game g ON s.game_id = g.id
-        GROUP BY
-            DATE_TRUNC('hour', s.submitted_at),
-            DATE(s.submitted_at),
-            EXTRACT(HOUR FROM s.submitted_at),
-            EXTRACT(DOW FROM s.submitted_at),
-            s.game_id,
-            g.name,
-            g.score_type
-        ORDER BY hour_bucket DESC;
-        """
+        GROUP BY s.user_id, s.game_id, u.email, u.name, g.name, g.score_type
+    )
+    SELECT
+        us.*,
+        fs.first_score,
+        ls.latest_score,
+        ls.latest_score - fs.first_score as score_improvement,
+        CASE
+            WHEN {score_is_better_sql(
+                "ls.latest_score", "fs.first_score", "us.score_type",
+            )} THEN 'Improving'
+            WHEN ls.latest_score = fs.first_score THEN 'Stable'
+            ELSE 'Declining'
+        END as improvement_trend,
+        CASE
+            WHEN total_attempts = 1 THEN 'Beginner'
+            WHEN total_attempts <= 5 THEN 'Casual'
+            WHEN total_attempts <= 20 THEN 'Regular'
+            ELSE 'Dedicated'
+        END as player_type,
+        EXTRACT(EPOCH FROM (last_attempt - first_attempt))/86400 as playing_period_days,
+        total_attempts::float / NULLIF(EXTRACT(EPOCH FROM (last_attempt - first_attempt))/86400, 0) as attempts_per_day
+    FROM user_stats us
+    JOIN first_scores fs ON fs.user_id = us.user_id AND fs.game_id = us.game_id
+    JOIN latest_scores ls ON ls.user_id = us.user_id AND ls.game_id = us.game_id
+    ORDER BY total_attempts DESC;
+
+    CREATE UNIQUE INDEX IF NOT EXISTS superset_user_performance_key
+        ON superset_user_performance (user_id, game_id);
+"""  # noqa: S608
+
+GAME_POPULARITY_SQL = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS superset_game_popularity AS
+    WITH weekly_scores AS (
+        -- Truncate each timestamp to its week once; read by every CTE below
+        SELECT
+            user_id,
+            game_id,
+            score,
+            submitted_at,
+            DATE_TRUNC('week', submitted_at) as week_start
+        FROM scores_score
+    ),
+    first_play AS (
+        SELECT
+            user_id,
+            game_id,
+            MIN(week_start) as first_week
+        FROM weekly_scores
+        GROUP BY user_id, game_id
+    ),
+    weekly_counts AS (
+        SELECT
+            g.id as game_id,
+            g.name as game_name,
+            g.score_type,
+            s.week_start,
+            COUNT(*) as weekly_submissions,
+            COUNT(DISTINCT s.user_id) as weekly_players,
+            AVG(s.score::float8) as weekly_avg_score,
+            COUNT(DISTINCT s.user_id) FILTER (
+                WHERE fp.first_week = s.week_start
+            ) as new_players_this_week
+        FROM games_game g
+        JOIN weekly_scores s ON g.id = s.game_id
+        JOIN first_play fp ON fp.user_id = s.user_id AND fp.game_id = s.game_id
+        GROUP BY g.id, g.name, g.score_type, s.week_start
+    ),
+    weekly_stats AS (
+        -- Ranks the (game, week) rows produced above, not the scores
+        SELECT
+            *,
+            RANK() OVER (
+                PARTITION BY week_start ORDER BY weekly_submissions DESC
+            ) as weekly_popularity_rank
+        FROM weekly_counts
+    ),
+    overall_stats AS (
+        SELECT
+            g.id as game_id,
+            g.name as game_name,
+            COUNT(*) as total_submissions,
+            COUNT(DISTINCT s.user_id) as total_players,
+            MIN(s.submitted_at) as first_activity,
+            MAX(s.submitted_at) as last_activity,
+            EXTRACT(EPOCH FROM (MAX(s.submitted_at) - MIN(s.submitted_at)))/604800 as active_weeks
+        FROM games_game g
+        JOIN weekly_scores s ON g.id = s.game_id
+        GROUP BY g.id, g.name
+    )
+    SELECT
+        ws.*,
+        os.total_submissions,
+        os.total_players,
+        os.first_activity,
+        os.last_activity,
+        os.active_weeks,
+        CASE
+            WHEN ws.weekly_popularity_rank <= 3 THEN 'Top'
+            WHEN ws.weekly_popularity_rank <= 10 THEN 'Popular'
+            ELSE 'Niche'
+        END as popularity_tier,
+        ws.weekly_submissions::float / NULLIF(ws.weekly_players, 0) as submissions_per_player_per_week,
+        ws.new_players_this_week::float / NULLIF(ws.weekly_players, 0) as new_player_ratio
+    FROM weekly_stats ws
+    JOIN overall_stats os ON ws.game_id = os.game_id
+    ORDER BY ws.week_start DESC, ws.weekly_submissions DESC;
+
+    CREATE UNIQUE INDEX IF NOT EXISTS superset_game_popularity_key
+        ON superset_game_popularity (game_id, week_start);
+"""
+
+# The whole setup script, sent to the database in a single round-trip
+SUPERSET_VIEWS_SQL = (
+    GAME_ANALYTICS_SQL
+    + USER_ENGAGEMENT_SQL
+    + LEADERBOARD_TRENDS_SQL
+    + SCORING_PATTERNS_SQL
+    + DAILY_METRICS_SQL
+    + USER_PERFORMANCE_SQL
+    + GAME_POPULARITY_SQL
+)
+
 
-        with connection.cursor() as cursor:
-            cursor.execute(sql)
+class Command(BaseCommand):
+    help = (
+        "Set up materialized views for Apache Superset analytics and dashboards. "
+        "Existing views are kept, pass --drop-existing to pick up definition changes."
+    )
 
-        self.stdout.write("  ✓ Scoring patterns view created")
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--drop-existing",
+            action="store_true",
+            help="Drop existing views before creating new ones",
+        )
 
-    def create_daily_metrics_view(self):
-        """Create daily metrics view for Superset."""
-        self.stdout.write("Creating daily metrics view...")
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS("Setting up Apache Superset database views..."))
 
-        sql = """
-        CREATE OR REPLACE VIEW superset_daily_metrics AS
-        SELECT
-            DATE(s.submitted_at) as metric_date,
-            COUNT(*) as total_submissions,
-            COUNT(DISTINCT s.user_id) as daily_active_users,
-            COUNT(DISTINCT s.game_id) as games_with_activity,
-            AVG(s.score) as avg_score,
-            COUNT(DISTINCT s.user_id) FILTER (WHERE u.date_joined::date = DATE(s.submitted_at)) as new_users_active,
-            COUNT(DISTINCT s.user_id) FILTER (WHERE u.date_joined::date < DATE(s.submitted_at)) as returning_users_active,
-            COUNT(*) / COUNT(DISTINCT s.user_id) as avg_submissions_per_user,
-            MAX(s.score) as daily_high_score,
-            COUNT(DISTINCT CASE WHEN
-                ROW_NUMBER() OVER (PARTITION BY s.user_id, s.game_id ORDER BY s.submitted_at) = 1
-                THEN s.user_id
-            END) as new_players_to_games,
-            EXTRACT(DOW FROM s.submitted_at) as day_of_week,
-            CASE EXTRACT(DOW FROM s.submitted_at)
-                WHEN 0 THEN 'Sunday'
-                WHEN 1 THEN 'Monday'
-                WHEN 2 THEN 'Tuesday'
-                WHEN 3 THEN 'Wednesday'
-                WHEN 4 THEN 'Thursday'
-                WHEN 5 THEN 'Friday'
-                WHEN 6 THEN 'Saturday'
-            END as day_name,
-            CASE
-                WHEN EXTRACT(DOW FROM s.submitted_at) IN (0, 6) THEN 'Weekend'
-                ELSE 'Weekday'
-            END as day_type
-        FROM scores_score s
-        JOIN users_user u ON s.user_id = u.id
-        GROUP BY DATE(s.submitted_at), EXTRACT(DOW FROM s.submitted_at)
-        ORDER BY metric_date DESC;
-        """
+        # One transaction for all the DDL, so a failure leaves the views as they were
+        with transaction.atomic(), connection.cursor() as cursor:
+            if options["drop_existing"]:
+                self.drop_existing_views(cursor)
+            else:
+                # Earlier versions created some views as a different kind
+                self.drop_existing_views(cursor, stale_only=True)
 
-        with connection.cursor() as cursor:
-            cursor.execute(sql)
-
-        self.stdout.write("  ✓ Daily metrics view created")
-
-    def create_user_performance_view(self):
-        """Create user performance view for Superset."""
-        self.stdout.write("Creating user performance view...")
-
-        sql = """
-        CREATE OR REPLACE VIEW superset_user_performance AS
-        WITH user_stats AS (
-            SELECT
-                s.user_id,
-                s.game_id,
-                u.email as user_email,
-                u.name as user_name,
-                g.name as game_name,
-                g.score_type,
-                COUNT(*) as total_attempts,
-                CASE WHEN g.score_type = 'highest' THEN MAX(s.score) ELSE MIN(s.score) END as best_score,
-                CASE WHEN g.score_type = 'highest' THEN MIN(s.score) ELSE MAX(s.score) END as worst_score,
-                AVG(s.score) as avg_score,
-                STDDEV(s.score) as score_consistency,
-                MIN(s.submitted_at) as first_attempt,
-                MAX(s.submitted_at) as last_attempt,
-                FIRST_VALUE(s.score) OVER (PARTITION BY s.user_id, s.game_id ORDER BY s.submitted_at) as first_score,
-                LAST_VALUE(s.score) OVER (PARTITION BY s.user_id, s.game_id ORDER BY s.submitted_at ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING) as latest_score
-            FROM scores_score s
-            JOIN users_user u ON s.user_id = u.id
-            JOIN games_game g ON s.game_id = g.id
-            GROUP BY s.user_id, s.game_id, u.email, u.name, g.name, g.score_type
-        )
-        SELECT
-            *,
-            latest_score - first_score as score_improvement,
-            CASE
-                WHEN score_type = 'highest' AND latest_score > first_score THEN 'Improving'
-                WHEN score_type IN ('lowest', 'time') AND latest_score < first_score THEN 'Improving'
-                WHEN latest_score = first_score THEN 'Stable'
-                ELSE 'Declining'
-            END as improvement_trend,
-            CASE
-                WHEN total_attempts = 1 THEN 'Beginner'
-                WHEN total_attempts <= 5 THEN 'Casual'
-                WHEN total_attempts <= 20 THEN 'Regular'
-                ELSE 'Dedicated'
-            END as player_type,
-            EXTRACT(EPOCH FROM (last_attempt - first_attempt))/86400 as playing_period_days,
-            total_attempts::float / NULLIF(EXTRACT(EPOCH FROM (last_attempt - first_attempt))/86400, 0) as attempts_per_day
-        FROM user_stats
-        ORDER BY total_attempts DESC;
-        """
+            self.stdout.write("Creating views...")
+            cursor.execute(SUPERSET_VIEWS_SQL)
+            refresh_scoring_patterns(cursor)
 
-        with connection.cursor() as cursor:
-            cursor.execute(sql)
-
-        self.stdout.write("  ✓ User performance view created")
-
-    def create_game_popularity_view(self):
-        """Create game popularity view for Superset."""
-        self.stdout.write("Creating game popularity view...")
-
-        sql = """
-        CREATE OR REPLACE VIEW superset_game_popularity AS
-        WITH weekly_stats AS (
-            SELECT
-                g.id as game_id,
-                g.name as game_name,
-                g.score_type,
-                DATE_TRUNC('week', s.submitted_at) as week_start,
-                COUNT(*) as weekly_submissions,
-                COUNT(DISTINCT s.user_id) as weekly_players,
-                AVG(s.score) as weekly_avg_score,
-                COUNT(DISTINCT s.user_id) FILTER (WHERE
-                    NOT EXISTS (
-                        SELECT 1 FROM scores_score s2
-                        WHERE s2.user_id = s.user_id
-                        AND s2.game_id = s.game_id
-                        AND s2.submitted_at < DATE_TRUNC('week', s.submitted_at)
-                    )
-                ) as new_players_this_week,
-                RANK() OVER (PARTITION BY DATE_TRUNC('week', s.submitted_at) ORDER BY COUNT(*) DESC) as weekly_popularity_rank
-            FROM games_game g
-            LEFT JOIN scores_score s ON g.id = s.game_id
-            WHERE s.submitted_at IS NOT NULL
-            GROUP BY g.id, g.name, g.score_type, DATE_TRUNC('week', s.submitted_at)
-        ),
-        overall_stats AS (
-            SELECT
-                g.id as game_id,
-                g.name as game_name,
-                COUNT(*) as total_submissions,
-                COUNT(DISTINCT s.user_id) as total_players,
-                MIN(s.submitted_at) as first_activity,
-                MAX(s.submitted_at) as last_activity,
-                EXTRACT(EPOCH FROM (MAX(s.submitted_at) - MIN(s.submitted_at)))/604800 as active_weeks
-            FROM games_game g
-            LEFT JOIN scores_score s ON g.id = s.game_id
-            WHERE s.submitted_at IS NOT NULL
-            GROUP BY g.id, g.name
-        )
-        SELECT
-            ws.*,
-            os.total_submissions,
-            os.total_players,
-            os.first_activity,
-            os.last_activity,
-            os.active_weeks,
-            CASE
-                WHEN ws.weekly_popularity_rank <= 3 THEN 'Top'
-                WHEN ws.weekly_popularity_rank <= 10 THEN 'Popular'
-                ELSE 'Niche'
-            END as popularity_tier,
-            ws.weekly_submissions::float / NULLIF(ws.weekly_players, 0) as submissions_per_player_per_week,
-            ws.new_players_this_week::float / NULLIF(ws.weekly_players, 0) as new_player_ratio
-        FROM weekly_stats ws
-        JOIN overall_stats os ON ws.game_id = os.game_id
-        ORDER BY ws.week_start DESC, ws.weekly_submissions DESC;
-        """
+        self.stdout.write(self.style.SUCCESS("✅ All Superset views created successfully!"))
+        self.show_views_summary()
 
-        with connection.cursor() as cursor:
-            cursor.execute(sql)
+    def drop_existing_views(self, cursor, *, stale_only=False):
+        """
+        Drop existing views, or only those that are not of the kind this
+        command creates them as.
+        """
+        views_by_kind = defaultdict(list)
+        for view_name, kind in get_view_kinds(cursor).items():
+            if not stale_only or kind != get_expected_kind(view_name):
+                views_by_kind[kind].append(view_name)
+        if not views_by_kind:
+            return
 
-        self.stdout.write("  ✓ Game popularity view created")
+        self.stdout.write("Dropping existing views...")
+        cursor.execute("\n".join(
+            f"DROP {DROP_KINDS[kind]} IF EXISTS {', '.join(view_names)} CASCADE;"
+            for kind, view_names in views_by_kind.items()
+        ))
+        for view_names in views_by_kind.values():
+            for view_name in view_names:
+                self.stdout.write(f"  ✓ Dropped {view_name}")
 
     def show_views_summary(self):
         """Show summary of created views."""
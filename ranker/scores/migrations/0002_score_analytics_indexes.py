@@ -0,0 +1,44 @@
+# Generated by Django 5.1.11 on 2026-10-15 21:45
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Build the new indexes without locking writes to the scores table
+    atomic = False
+
+    dependencies = [
+        ('games', '0002_game_game_active_name_idx'),
+        ('scores', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RenameIndex(
+            model_name='score',
+            new_name='scores_scor_user_id_2d68bf_idx',
+            old_name='scores_scor_user_id_5b8d3e_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='score',
+            new_name='scores_scor_game_id_b37bad_idx',
+            old_name='scores_scor_game_id_80b97f_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='score',
+            new_name='scores_scor_game_id_519e32_idx',
+            old_name='scores_scor_game_id_4f8b6e_idx',
+        ),
+        AddIndexConcurrently(
+            model_name='score',
+            index=models.Index(fields=['user', 'submitted_at'], name='score_user_submitted_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='score',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['submitted_at'], name='score_submitted_at_brin'),
+        ),
+    ]
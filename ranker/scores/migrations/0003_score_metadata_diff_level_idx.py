@@ -0,0 +1,25 @@
+# Generated by Django 5.1.11 on 2026-10-15 21:49
+
+import django.db.models.fields.json
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Build the index without locking writes to the scores table
+    atomic = False
+
+    dependencies = [
+        ('games', '0002_game_game_active_name_idx'),
+        ('scores', '0002_score_analytics_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='score',
+            index=models.Index(django.db.models.fields.json.KeyTransform('difficulty', 'metadata'), django.db.models.fields.json.KeyTransform('level', 'metadata'), condition=models.Q(('metadata', {}), _negated=True), name='score_metadata_diff_level_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.11 on 2026-10-15 21:54
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Swap the indexes without locking writes to the scores table
+    atomic = False
+
+    dependencies = [
+        ('games', '0002_game_game_active_name_idx'),
+        ('scores', '0003_score_metadata_diff_level_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Build the covering index before dropping the one it replaces
+        AddIndexConcurrently(
+            model_name='score',
+            index=models.Index(fields=['game', '-submitted_at'], include=('user', 'score'), name='score_game_submitted_cov_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='score',
+            name='scores_scor_game_id_519e32_idx',
+        ),
+    ]
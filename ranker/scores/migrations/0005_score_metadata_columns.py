@@ -0,0 +1,57 @@
+# Generated by Django 5.1.11 on 2026-10-15 22:02
+
+from django.db import migrations, models
+from django.db.models import Max
+
+# Rows are backfilled in id ranges of this size, each committed on its own
+BACKFILL_BATCH_SIZE = 10000
+
+# Same rules as Score.set_metadata_fields()
+BACKFILL_METADATA_COLUMNS = r"""
+UPDATE scores_score SET
+    difficulty = CASE
+        WHEN jsonb_typeof(metadata->'difficulty') = 'string' AND length(metadata->>'difficulty') <= 8
+        THEN metadata->>'difficulty'
+    END,
+    level = CASE WHEN metadata->>'level' ~ '^-?\d{1,9}$' THEN (metadata->>'level')::int END,
+    time_played = CASE WHEN metadata->>'time_played' ~ '^-?\d{1,9}$' THEN (metadata->>'time_played')::int END
+WHERE id > %s AND id <= %s AND metadata <> '{}';
+"""
+
+
+def backfill_metadata_columns(apps, schema_editor):
+    Score = apps.get_model('scores', 'Score')
+    last_id = Score.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+    with schema_editor.connection.cursor() as cursor:
+        for start in range(0, last_id, BACKFILL_BATCH_SIZE):
+            cursor.execute(BACKFILL_METADATA_COLUMNS, [start, start + BACKFILL_BATCH_SIZE])
+
+
+class Migration(migrations.Migration):
+
+    # Each backfill batch commits separately instead of locking every row of
+    # the scores table until the whole backfill is done
+    atomic = False
+
+    dependencies = [
+        ('scores', '0004_score_game_submitted_covering_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='score',
+            name='difficulty',
+            field=models.CharField(blank=True, editable=False, max_length=8, null=True, verbose_name='Difficulty'),
+        ),
+        migrations.AddField(
+            model_name='score',
+            name='level',
+            field=models.IntegerField(blank=True, editable=False, null=True, verbose_name='Level'),
+        ),
+        migrations.AddField(
+            model_name='score',
+            name='time_played',
+            field=models.IntegerField(blank=True, editable=False, null=True, verbose_name='Time Played'),
+        ),
+        migrations.RunPython(backfill_metadata_columns, migrations.RunPython.noop),
+    ]
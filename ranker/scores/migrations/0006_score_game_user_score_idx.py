@@ -0,0 +1,24 @@
+# Generated by Django 5.1.11 on 2026-10-15 22:10
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Build the index without locking writes to the scores table
+    atomic = False
+
+    dependencies = [
+        ('games', '0002_game_game_active_name_idx'),
+        ('scores', '0005_score_metadata_columns'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='score',
+            index=models.Index(fields=['game', 'user', 'score'], name='score_game_user_score_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.11 on 2026-10-15 22:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Build the unique index without locking writes to the scores table
+    atomic = False
+
+    dependencies = [
+        ('scores', '0006_score_game_user_score_idx'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='score',
+                    name='submission_id',
+                    field=models.UUIDField(blank=True, editable=False, null=True, unique=True, verbose_name='Submission ID'),
+                ),
+            ],
+            database_operations=[
+                migrations.AddField(
+                    model_name='score',
+                    name='submission_id',
+                    field=models.UUIDField(blank=True, editable=False, null=True, verbose_name='Submission ID'),
+                ),
+                # Same constraint name as ADD COLUMN ... UNIQUE would create
+                migrations.RunSQL(
+                    'CREATE UNIQUE INDEX CONCURRENTLY "scores_score_submission_id_key" '
+                    'ON "scores_score" ("submission_id");',
+                    'DROP INDEX CONCURRENTLY IF EXISTS "scores_score_submission_id_key";',
+                ),
+                migrations.RunSQL(
+                    'ALTER TABLE "scores_score" ADD CONSTRAINT "scores_score_submission_id_key" '
+                    'UNIQUE USING INDEX "scores_score_submission_id_key";',
+                    'ALTER TABLE "scores_score" DROP CONSTRAINT "scores_score_submission_id_key";',
+                ),
+            ],
+        ),
+    ]
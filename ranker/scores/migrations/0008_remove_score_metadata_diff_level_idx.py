@@ -0,0 +1,21 @@
+# Generated by Django 5.1.11 on 2026-10-15 22:24
+
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # Drop the index without locking writes to the scores table
+    atomic = False
+
+    dependencies = [
+        ('scores', '0007_score_submission_id'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='score',
+            name='score_metadata_diff_level_idx',
+        ),
+    ]
@@ -1,12 +1,29 @@
+import re
+
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import BrinIndex
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db import transaction
+from django.db.models import Case
+from django.db.models import F
+from django.db.models import When
 from django.utils.translation import gettext_lazy as _
 
+from ranker.games.cache import get_game_score_type
 from ranker.games.models import Game
 
 User = get_user_model()
 
+# Integer metadata values that fit the promoted integer columns
+METADATA_INT_RE = re.compile(r"-?\d{1,9}")
+
+
+def get_metadata_int(metadata, key):
+    """Get an integer metadata value, or None if it is missing or not an integer."""
+    value = str(metadata.get(key, ""))
+    return int(value) if METADATA_INT_RE.fullmatch(value) else None
+
 
 class Score(models.Model):
     """
@@ -51,6 +68,42 @@ class Score(models.Model):
         help_text=_("Additional game-specific data (e.g., level, time taken)"),
     )
 
+    # Set for scores stored in the background after an API submission, so a
+    # retried task cannot store the same submission twice
+    submission_id = models.UUIDField(
+        _("Submission ID"),
+        null=True,
+        blank=True,
+        unique=True,
+        editable=False,
+    )
+
+    # Metadata keys the analytics aggregate over, copied into typed columns
+    # so queries do not extract and cast them from JSON per row. A missing
+    # key is NULL in every column, so reports keep "no difficulty" apart
+    # from an empty string sent by a client.
+    difficulty = models.CharField(  # noqa: DJ001
+        _("Difficulty"),
+        max_length=8,
+        null=True,
+        blank=True,
+        editable=False,
+    )
+
+    level = models.IntegerField(
+        _("Level"),
+        null=True,
+        blank=True,
+        editable=False,
+    )
+
+    time_played = models.IntegerField(
+        _("Time Played"),
+        null=True,
+        blank=True,
+        editable=False,
+    )
+
     class Meta:
         verbose_name = _("Score")
         verbose_name_plural = _("Scores")
@@ -58,42 +111,124 @@ class Score(models.Model):
         indexes = [
             models.Index(fields=["user", "game"]),
             models.Index(fields=["game", "-score"]),
-            models.Index(fields=["game", "-submitted_at"]),
+            # Lets the leaderboard rebuild aggregate each user's best score
+            # per game from an index-only scan
+            models.Index(
+                fields=["game", "user", "score"],
+                name="score_game_user_score_idx",
+            ),
+            # Covers per-game date-window scans (recent scores, Superset views)
+            models.Index(
+                fields=["game", "-submitted_at"],
+                include=["user", "score"],
+                name="score_game_submitted_cov_idx",
+            ),
+            # Per-user history over a date window (analytics reports)
+            models.Index(
+                fields=["user", "submitted_at"],
+                name="score_user_submitted_idx",
+            ),
+            # Scores are appended in submitted_at order, so a BRIN index serves
+            # long date-range scans at a fraction of a B-tree's size
+            BrinIndex(fields=["submitted_at"], name="score_submitted_at_brin"),
         ]
 
     def __str__(self):
         return f"{self.user.email} - {self.game.name}: {self.score}"
 
-    def save(self, *args, **kwargs):
-        """Override save to update Redis leaderboard after saving to database."""
+    def save(self, *args, update_leaderboard=True, **kwargs):
+        """
+        Override save to update Redis leaderboard after saving to database.
+
+        The update runs once the transaction commits, so a rolled back score
+        never reaches the leaderboard. Pass update_leaderboard=False when the
+        caller updates Redis itself.
+        """
         is_new = self.pk is None
+        self.set_metadata_fields()
         super().save(*args, **kwargs)
 
         # Update Redis leaderboard after saving
-        if is_new:
-            self.update_redis_leaderboard()
+        if is_new and update_leaderboard:
+            transaction.on_commit(self.update_redis_leaderboard)
+
+    def set_metadata_fields(self):
+        """Copy the promoted metadata keys into their columns."""
+        metadata = self.metadata if isinstance(self.metadata, dict) else {}
+        difficulty = metadata.get("difficulty")
+        max_length = self._meta.get_field("difficulty").max_length
+        if not isinstance(difficulty, str) or len(difficulty) > max_length:
+            difficulty = None
+        self.difficulty = difficulty
+        self.level = get_metadata_int(metadata, "level")
+        self.time_played = get_metadata_int(metadata, "time_played")
 
     def update_redis_leaderboard(self):
         """Update Redis leaderboard with this score."""
-        from .services import LeaderboardService
+        from .services import leaderboard_service
 
-        service = LeaderboardService()
-        service.update_user_score(
-            game_id=self.game.id,
-            user_id=self.user.id,
+        # The cached score type avoids loading self.game (and self.user) per score
+        leaderboard_service.update_user_score(
+            game_id=self.game_id,
+            user_id=self.user_id,
             score=float(self.score),
-            game_score_type=self.game.score_type,
+            game_score_type=get_game_score_type(self.game_id),
+        )
+
+    @classmethod
+    def bulk_submit(cls, scores):
+        """
+        Insert many new scores and add them to the Redis leaderboards.
+
+        Unlike calling save() per score, this issues batched INSERTs and a
+        single pipelined Redis update, which also runs on commit.
+        """
+        from .services import leaderboard_service
+
+        # bulk_create() does not call save()
+        for score in scores:
+            score.set_metadata_fields()
+        scores = cls.objects.bulk_create(scores, batch_size=1000)
+
+        score_types = dict(
+            Game.objects.filter(id__in={score.game_id for score in scores})
+            .values_list("id", "score_type"),
+        )
+        entries = [
+            (
+                score.game_id,
+                score.user_id,
+                float(score.score),
+                score_types[score.game_id],
+            )
+            for score in scores
+        ]
+        transaction.on_commit(lambda: leaderboard_service.update_user_scores(entries))
+        return scores
+
+    @classmethod
+    def best_scores_for(cls, users, games):
+        """
+        Get each user's best score in each of the given games.
+
+        Returns a queryset with one score per (user, game) pair that has any,
+        fetched in a single DISTINCT ON query.
+        """
+        # Ascending order puts the best score first for every score type
+        best_first = Case(
+            When(game__score_type="highest", then=-F("score")),
+            default=F("score"),
+        )
+        return (
+            cls.objects.filter(user__in=users, game__in=games)
+            .order_by("user_id", "game_id", best_first, "submitted_at")
+            .distinct("user_id", "game_id")
         )
 
     @classmethod
     def get_user_best_score(cls, user, game):
         """Get the user's best score for a specific game."""
-        scores = cls.objects.filter(user=user, game=game)
-
-        if game.score_type == "highest":
-            return scores.order_by("-score").first()
-        # lowest or time
-        return scores.order_by("score").first()
+        return cls.best_scores_for([user], [game]).first()
 
     @classmethod
     def get_user_score_history(cls, user, game, limit=None):
@@ -0,0 +1,456 @@
+"""
+Builders for the admin analytics reports.
+
+The reports aggregate over the whole scores table, so they are built by the
+Celery tasks in ranker.scores.tasks and the report views serve the cached
+payloads.
+"""
+
+from collections import defaultdict
+from datetime import UTC
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Aggregate
+from django.db.models import Avg
+from django.db.models import Count
+from django.db.models import ExpressionWrapper
+from django.db.models import F
+from django.db.models import FloatField
+from django.db.models import Max
+from django.db.models import Min
+from django.db.models import OuterRef
+from django.db.models import Q
+from django.db.models import StdDev
+from django.db.models import Subquery
+from django.db.models.functions import TruncDate
+from django.db.models.functions import TruncDay
+from django.db.models.functions import TruncHour
+from django.db.models.functions import TruncMonth
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from ranker.games.cache import get_game_cached
+from ranker.users.models import User
+
+from .api.serializers import GameAnalyticsSerializer
+from .api.serializers import LeaderboardTrendsSerializer
+from .api.serializers import ScoringPatternsSerializer
+from .api.serializers import UserEngagementSerializer
+from .models import Score
+from .services import leaderboard_service
+
+REPORT_PERIODS = ("daily", "weekly", "monthly")
+
+# Reports are rebuilt by the beat schedule well within this timeout
+REPORT_CACHE_TIMEOUT = 15 * 60
+# Matches CELERY_TASK_TIME_LIMIT, so a lost build is retried after it expires
+REPORT_BUILD_LOCK_TIMEOUT = 5 * 60
+# Unsliced report querysets are streamed into their serializers in chunks of
+# this size rather than cached in full on the queryset first
+REPORT_CHUNK_SIZE = 500
+
+
+class Percentile(Aggregate):
+    """PostgreSQL PERCENTILE_CONT ordered-set aggregate."""
+
+    function = "PERCENTILE_CONT"
+    template = "%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+
+def report_cache_key(report, *args):
+    """Cache key for a report built with the given arguments."""
+    return ":".join(["analytics", report, *map(str, args)])
+
+
+def get_cached_report(report, *args):
+    """Return the cached report payload, or None if it has not been built."""
+    return cache.get(report_cache_key(report, *args))
+
+
+def claim_report_build(report, *args):
+    """
+    Return True if the caller should enqueue a build of this report.
+
+    Only the first caller gets True until the build finishes or the lock
+    expires, so repeated requests do not pile up duplicate builds.
+    """
+    return cache.add(
+        f"{report_cache_key(report, *args)}:building",
+        value=True,
+        timeout=REPORT_BUILD_LOCK_TIMEOUT,
+    )
+
+
+def release_report_build(report, *args):
+    """Release the build lock of a report, so the next request can claim it."""
+    cache.delete(f"{report_cache_key(report, *args)}:building")
+
+
+def cache_report(report, *args, payload):
+    """Store a built report payload and release its build lock."""
+    cache.set(report_cache_key(report, *args), payload, REPORT_CACHE_TIMEOUT)
+    release_report_build(report, *args)
+
+
+def game_analytics(period, game_id=None):
+    """Generate comprehensive game analytics."""
+    # Calculate date range
+    now = timezone.now()
+    if period == "daily":
+        start_date = now - timedelta(days=7)  # Last 7 days for daily view
+        trunc_func = TruncDay
+    elif period == "weekly":
+        start_date = now - timedelta(weeks=12)  # Last 12 weeks
+        trunc_func = TruncWeek
+    elif period == "monthly":
+        start_date = now - timedelta(days=365)  # Last year
+        trunc_func = TruncMonth
+    else:
+        msg = f"Invalid period: {period}"
+        raise ValueError(msg)
+
+    query = Q(submitted_at__gte=start_date)
+    if game_id:
+        query &= Q(game_id=game_id)
+
+    # Game performance metrics
+    games_stats = (
+        Score.objects.filter(query)
+        .values("game__id", "game__name", "game__score_type")
+        .annotate(
+            total_plays=Count("id"),
+            unique_players=Count("user", distinct=True),
+            avg_score=Avg("score"),
+            max_score=Max("score"),
+            min_score=Min("score"),
+            score_range=F("max_score") - F("min_score"),
+            first_play=Min("submitted_at"),
+            last_play=Max("submitted_at"),
+        )
+        .order_by("-total_plays")
+    )
+
+    # Trending data over time
+    trending_data = (
+        Score.objects.filter(query)
+        .annotate(period=trunc_func("submitted_at"))
+        .values("period")
+        .annotate(
+            total_submissions=Count("id"),
+            unique_players=Count("user", distinct=True),
+            avg_score=Avg("score"),
+        )
+        .order_by("period")
+    )
+
+    # Score distribution analysis
+    score_distribution = (
+        Score.objects.filter(query)
+        .aggregate(
+            total_scores=Count("id"),
+            percentile_25=Percentile("score", percentile=0.25),
+            percentile_50=Percentile("score", percentile=0.5),
+            percentile_75=Percentile("score", percentile=0.75),
+            std_deviation=StdDev("score", sample=True),
+        )
+    )
+
+    return GameAnalyticsSerializer({
+        "period": period,
+        "start_date": start_date,
+        "end_date": now,
+        "games_performance": games_stats.iterator(chunk_size=REPORT_CHUNK_SIZE),
+        "trending_data": trending_data.iterator(chunk_size=REPORT_CHUNK_SIZE),
+        "score_distribution": score_distribution,
+    }).data
+
+
+def user_engagement(period):
+    """Generate user engagement analytics."""
+    # Calculate date range
+    now = timezone.now()
+    if period == "daily":
+        start_date = now - timedelta(days=30)
+        trunc_func = TruncDay
+    elif period == "weekly":
+        start_date = now - timedelta(weeks=12)
+        trunc_func = TruncWeek
+    elif period == "monthly":
+        start_date = now - timedelta(days=365)
+        trunc_func = TruncMonth
+    else:
+        msg = f"Invalid period: {period}"
+        raise ValueError(msg)
+
+    # User activity metrics
+    user_activity = (
+        Score.objects.filter(submitted_at__gte=start_date)
+        .values("user__id", "user__email", "user__name")
+        .annotate(
+            total_sessions=Count("id"),
+            games_played=Count("game", distinct=True),
+            avg_score=Avg("score"),
+            best_score=Max("score"),
+            first_activity=Min("submitted_at"),
+            last_activity=Max("submitted_at"),
+        )
+        .order_by("-total_sessions")[:50]  # Top 50 most active users
+    )
+
+    # Derived from the aggregates above in Python rather than in SQL. Users
+    # active for less than a day count as active for one day.
+    user_activity = list(user_activity)
+    for row in user_activity:
+        row["activity_span_days"] = row["last_activity"] - row["first_activity"]
+        span_days = row["activity_span_days"].total_seconds() / 86400
+        row["sessions_per_day"] = row["total_sessions"] / max(span_days, 1)
+
+    # Engagement trends over time
+    engagement_trends = (
+        Score.objects.filter(submitted_at__gte=start_date)
+        .annotate(period=trunc_func("submitted_at"))
+        .values("period")
+        .annotate(
+            active_users=Count("user", distinct=True),
+            total_sessions=Count("id"),
+            avg_session_length=Avg("time_played"),  # If available in metadata
+        )
+        .order_by("period")
+    )
+
+    # New vs returning users over the last 7 days, in one grouped query
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    daily_counts = {
+        row["day"]: row
+        for row in Score.objects.filter(
+            submitted_at__gte=today_start - timedelta(days=6),
+            submitted_at__lt=today_start + timedelta(days=1),
+        )
+        .annotate(day=TruncDate("submitted_at", tzinfo=UTC))
+        .values("day")
+        .annotate(
+            total_users=Count("user", distinct=True),
+            new_users=Count(
+                "user",
+                distinct=True,
+                filter=Q(user__date_joined__gte=F("day")),
+            ),
+        )
+    }
+
+    new_vs_returning = []
+    for days_ago in range(7):
+        date = (today_start - timedelta(days=days_ago)).date()
+        counts = daily_counts.get(date, {"total_users": 0, "new_users": 0})
+
+        new_vs_returning.append({
+            "date": date,
+            "new_users": counts["new_users"],
+            "returning_users": counts["total_users"] - counts["new_users"],
+            "total_users": counts["total_users"],
+        })
+
+    return UserEngagementSerializer({
+        "period": period,
+        "start_date": start_date,
+        "end_date": now,
+        "user_activity": user_activity,
+        "engagement_trends": engagement_trends.iterator(chunk_size=REPORT_CHUNK_SIZE),
+        "new_vs_returning": new_vs_returning,
+    }).data
+
+
+def leaderboard_trends(period, game_id):
+    """Generate leaderboard trends analysis, or None if the game does not exist."""
+    game = get_game_cached(game_id)
+    if game is None:
+        return None
+
+    # Calculate date range
+    now = timezone.now()
+    if period == "daily":
+        start_date = now - timedelta(days=30)
+    elif period == "weekly":
+        start_date = now - timedelta(weeks=12)
+    elif period == "monthly":
+        start_date = now - timedelta(days=365)
+    else:
+        msg = f"Invalid period: {period}"
+        raise ValueError(msg)
+
+    # Get current Redis leaderboard
+    current_leaderboard = leaderboard_service.get_leaderboard(game_id, 0, 99)
+
+    # Historical score progression for top players
+    top_user_ids = [player["user_id"] for player in current_leaderboard[:10]]
+
+    # One query for all their scores and one for the users, grouped here
+    history_by_user = defaultdict(list)
+    user_scores = (
+        Score.objects.filter(
+            user_id__in=top_user_ids,
+            game=game,
+            submitted_at__gte=start_date,
+        )
+        .order_by("submitted_at")
+        .values("user_id", "submitted_at", "score")
+    )
+    for row in user_scores:
+        history_by_user[row.pop("user_id")].append(row)
+
+    users = User.objects.only("id", "email", "name").in_bulk(list(history_by_user))
+
+    score_progression = []
+    for user_id in top_user_ids:
+        history = history_by_user.get(user_id)
+
+        if history:
+            user = users[user_id]
+            score_progression.append({
+                "user_id": user_id,
+                "username": user.email,
+                "name": user.name or user.email,
+                "score_history": history,
+                "improvement": (
+                    history[-1]["score"] - history[0]["score"]
+                    if len(history) > 1 else 0
+                ),
+            })
+
+    # Competition intensity metrics
+    competition_metrics = (
+        Score.objects.filter(game=game, submitted_at__gte=start_date)
+        .aggregate(
+            total_participants=Count("user", distinct=True),
+            score_submissions=Count("id"),
+            score_range=Max("score") - Min("score"),
+        )
+    )
+    total_participants = competition_metrics["total_participants"]
+    competition_metrics["avg_submissions_per_user"] = (
+        competition_metrics["score_submissions"] / total_participants
+        if total_participants else 0
+    )
+
+    return LeaderboardTrendsSerializer({
+        "game_id": game_id,
+        "game_name": game.name,
+        "period": period,
+        "start_date": start_date,
+        "end_date": now,
+        "current_leaderboard": current_leaderboard[:10],
+        "score_progression": score_progression,
+        "competition_metrics": competition_metrics,
+    }).data
+
+
+def scoring_patterns(period, game_id=None):
+    """Generate scoring patterns analysis."""
+    # Calculate date range
+    now = timezone.now()
+    if period == "daily":
+        start_date = now - timedelta(days=7)
+    elif period == "weekly":
+        start_date = now - timedelta(weeks=4)
+    elif period == "monthly":
+        start_date = now - timedelta(days=90)
+    else:
+        msg = f"Invalid period: {period}"
+        raise ValueError(msg)
+
+    query = Q(submitted_at__gte=start_date)
+    if game_id:
+        query &= Q(game_id=game_id)
+
+    # Peak activity hours
+    peak_hours = (
+        Score.objects.filter(query)
+        .annotate(hour=TruncHour("submitted_at"))
+        .values("hour")
+        .annotate(submissions=Count("id"))
+        .order_by("-submissions")[:24]
+    )
+
+    # Score improvement patterns for up to 20 active users, one row per user
+    active_users = (
+        Score.objects.filter(query)
+        .values("user_id")
+        .distinct()
+        .order_by("user_id")[:20]  # Top 20 for performance
+    )
+    user_scores = Score.objects.filter(
+        user_id=OuterRef("user_id"),
+        submitted_at__gte=start_date,
+    ).values("score")
+    first_score = Subquery(user_scores.order_by("submitted_at", "id")[:1])
+    last_score = Subquery(user_scores.order_by("-submitted_at", "-id")[:1])
+
+    user_patterns = (
+        Score.objects.filter(user_id__in=active_users, submitted_at__gte=start_date)
+        .values("user_id")
+        .annotate(
+            total_sessions=Count("id"),
+            starting_score=first_score,
+            ending_score=last_score,
+            peak_score=Max("score"),
+            consistent_sessions=Count("id", filter=Q(score__gte=first_score)),
+        )
+        .filter(total_sessions__gt=1)
+        .order_by("user_id")
+    )
+
+    improvement_patterns = [
+        {
+            "user_id": pattern["user_id"],
+            "total_sessions": pattern["total_sessions"],
+            "starting_score": pattern["starting_score"],
+            "ending_score": pattern["ending_score"],
+            "improvement": pattern["ending_score"] - pattern["starting_score"],
+            "consistency": pattern["consistent_sessions"] / pattern["total_sessions"],
+            "peak_score": pattern["peak_score"],
+        }
+        for pattern in user_patterns
+    ]
+
+    # Metadata analysis (if available)
+    metadata_patterns = (
+        Score.objects.filter(query)
+        .exclude(metadata={})
+        .values("difficulty", "level")
+        .annotate(
+            avg_score=Avg("score"),
+            count=Count("id"),
+        )
+        .order_by("-count")[:10]
+    )
+
+    # Submission frequency patterns
+    frequency_patterns = (
+        Score.objects.filter(query)
+        .values("user_id")
+        .annotate(
+            submission_count=Count("id"),
+            days_active=Count("submitted_at__date", distinct=True),
+        )
+        # Reuse the counts above instead of aggregating them a second time
+        .annotate(
+            avg_daily_submissions=ExpressionWrapper(
+                F("submission_count") * 1.0 / F("days_active"),
+                output_field=FloatField(),
+            ),
+        )
+        .filter(submission_count__gte=5)  # Users with at least 5 submissions
+        .order_by("-avg_daily_submissions")[:20]
+    )
+
+    return ScoringPatternsSerializer({
+        "period": period,
+        "start_date": start_date,
+        "end_date": now,
+        "peak_activity_hours": peak_hours,
+        "improvement_patterns": improvement_patterns,
+        "metadata_patterns": metadata_patterns,
+        "frequency_patterns": frequency_patterns,
+    }).data
@@ -1,12 +1,39 @@
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
 
 import redis
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Max
+from django.db.models import Min
 
+from ranker.games.cache import get_game_score_type
 from ranker.games.models import Game
 
 User = get_user_model()
 
+# The first page of a game leaderboard is read far more often than it
+# changes, so it is served from the cache for a couple of seconds
+TOP_LEADERBOARD_SIZE = 20
+TOP_LEADERBOARD_CACHE_TIMEOUT = 2
+
+# User profiles are dropped when the user's display fields change, and
+# expire so changes that bypass post_save (QuerySet.update(), raw SQL, a
+# failed delete) are still picked up from the database
+USER_PROFILE_TIMEOUT = 60 * 60
+
+# One connection pool per process, shared by every LeaderboardService. Once
+# all connections are in use, callers wait for one to be released rather
+# than opening more. Replies are decoded to str by the client's parser.
+REDIS_MAX_CONNECTIONS = 50
+redis_pool = redis.BlockingConnectionPool.from_url(
+    settings.REDIS_URL,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    decode_responses=True,
+)
+
 
 class LeaderboardService:
     """
@@ -15,8 +42,8 @@ class LeaderboardService:
     """
 
     def __init__(self):
-        """Initialize Redis connection."""
-        self.redis_client = redis.from_url(settings.REDIS_URL)
+        """Initialize Redis client on the shared connection pool."""
+        self.redis_client = redis.Redis(connection_pool=redis_pool)
 
     def get_leaderboard_key(self, game_id: int) -> str:
         """Get Redis key for a game's leaderboard."""
@@ -26,9 +53,19 @@ class LeaderboardService:
         """Get Redis key for global leaderboard."""
         return "leaderboard:global"
 
+    def get_top_leaderboard_cache_key(self, game_id: int) -> str:
+        """Get cache key for the first page of a game's leaderboard."""
+        return f"leaderboard:{game_id}:top"
+
+    def invalidate_top_leaderboards(self, *game_ids: int) -> None:
+        """Drop the cached first page of the given games' leaderboards."""
+        cache.delete_many(
+            [self.get_top_leaderboard_cache_key(game_id) for game_id in game_ids],
+        )
+
     def update_user_score(self, game_id: int, user_id: int, score: float, game_score_type: str = "highest") -> None:
         """
-        Update user's score in Redis leaderboard.
+        Update user's score in Redis leaderboard, keeping their best score per game.
 
         Args:
             game_id: ID of the game
@@ -39,14 +76,108 @@ class LeaderboardService:
         game_key = self.get_leaderboard_key(game_id)
         global_key = self.get_global_leaderboard_key()
 
+        member = str(user_id)
+
         # Convert score based on game type for Redis sorting
         redis_score = self._convert_score_for_redis(score, game_score_type)
 
-        # Update game-specific leaderboard
-        self.redis_client.zadd(game_key, {str(user_id): redis_score})
-
+        # Both writes share one round trip; they are independent, so no MULTI/EXEC
+        pipe = self.redis_client.pipeline(transaction=False)
+        # Update game-specific leaderboard; LT keeps the user's best score
+        pipe.zadd(game_key, {member: redis_score}, lt=True)
         # Update global leaderboard (use original score for global)
-        self.redis_client.zadd(global_key, {str(user_id): score})
+        pipe.zadd(global_key, {member: score})
+        pipe.execute()
+
+        self.invalidate_top_leaderboards(game_id)
+
+    def update_user_scores(self, entries: list[tuple[int, int, float, str]]) -> None:
+        """
+        Add many scores to the Redis leaderboards in one pipelined round trip.
+
+        Each game leaderboard keeps a user's best score, whether it comes from
+        this batch or is already stored.
+
+        Args:
+            entries: (game_id, user_id, score, game_score_type) tuples
+        """
+        # Best score per user and game within the batch; lower redis scores rank higher
+        best_scores = {}
+        for game_id, user_id, score, game_score_type in entries:
+            redis_score = self._convert_score_for_redis(score, game_score_type)
+            best = best_scores.get((game_id, user_id))
+            if best is None or redis_score < best[0]:
+                best_scores[game_id, user_id] = (redis_score, score)
+
+        if not best_scores:
+            return
+
+        by_game = defaultdict(dict)
+        for (game_id, user_id), (redis_score, _) in best_scores.items():
+            by_game[game_id][str(user_id)] = redis_score
+
+        pipe = self.redis_client.pipeline()
+        for game_id, mapping in by_game.items():
+            # LT only replaces members whose stored score is higher (worse)
+            pipe.zadd(self.get_leaderboard_key(game_id), mapping, lt=True)
+        # Global leaderboard keeps the original score
+        pipe.zadd(
+            self.get_global_leaderboard_key(),
+            {str(user_id): score for (_, user_id), (_, score) in best_scores.items()},
+        )
+        pipe.execute()
+
+        self.invalidate_top_leaderboards(*by_game)
+
+    def submit_and_get_rank(
+        self,
+        game_id: int,
+        user_id: int,
+        score: float,
+        game_score_type: str = "highest",
+    ) -> dict:
+        """
+        Record a submitted score and read back the user's rank.
+
+        The game leaderboard keeps each user's best score, so it is only
+        updated when the submission beats the stored one. The previous best,
+        the writes and the rank lookup share one MULTI/EXEC round trip.
+
+        Args:
+            game_id: ID of the game
+            user_id: ID of the user
+            score: The submitted score
+            game_score_type: Type of scoring (highest, lowest, time)
+
+        Returns:
+            Dictionary with the user's rank (1-indexed), the number of players
+            and whether the score is a personal best
+        """
+        game_key = self.get_leaderboard_key(game_id)
+        member = str(user_id)
+        redis_score = self._convert_score_for_redis(score, game_score_type)
+
+        pipe = self.redis_client.pipeline()
+        pipe.zscore(game_key, member)
+        # LT only replaces a stored score that is higher (worse), so a
+        # concurrent submission can never overwrite a better best
+        pipe.zadd(game_key, {member: redis_score}, lt=True)
+        pipe.zadd(self.get_global_leaderboard_key(), {member: score})
+        pipe.zrank(game_key, member)
+        pipe.zcard(game_key)
+        previous_best, *_, rank, total_players = pipe.execute()
+
+        # Lower Redis scores rank higher for every game type
+        is_personal_best = previous_best is None or redis_score < previous_best
+
+        if is_personal_best:
+            self.invalidate_top_leaderboards(game_id)
+
+        return {
+            "user_rank": rank + 1,  # Convert to 1-indexed
+            "total_players": total_players,
+            "is_personal_best": is_personal_best,
+        }
 
     def _convert_score_for_redis(self, score: float, game_score_type: str) -> float:
         """
@@ -65,6 +196,52 @@ class LeaderboardService:
             return -redis_score
         return redis_score
 
+    def get_user_profile_key(self, user_id: int) -> str:
+        """Get Redis key for the display fields of a user shown on leaderboards."""
+        return f"user:profile:{user_id}"
+
+    def delete_user_profile(self, user_id: int) -> None:
+        """Remove a user's leaderboard display fields from Redis."""
+        self.redis_client.delete(self.get_user_profile_key(user_id))
+
+    def _get_user_details(self, user_ids: list[int]) -> dict[int, dict]:
+        """
+        Fetch display fields for the given users, keyed by user id.
+
+        Profiles are read from Redis in one pipelined round trip. Users
+        without a stored profile are loaded from the database in one query
+        and their profiles stored for the next read, until they expire.
+        """
+        pipe = self.redis_client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.hmget(self.get_user_profile_key(user_id), "email", "name")
+
+        profiles = {}
+        missing_ids = []
+        for user_id, (email, name) in zip(user_ids, pipe.execute(), strict=True):
+            if email is None:
+                missing_ids.append(user_id)
+            else:
+                profiles[user_id] = (email, name)
+
+        if missing_ids:
+            pipe = self.redis_client.pipeline(transaction=False)
+            users = User.objects.filter(id__in=missing_ids)
+            for user_id, email, name in users.values_list("id", "email", "name"):
+                profiles[user_id] = (email, name)
+                profile_key = self.get_user_profile_key(user_id)
+                pipe.hset(profile_key, mapping={"email": email, "name": name})
+                pipe.expire(profile_key, USER_PROFILE_TIMEOUT)
+            pipe.execute()
+
+        return {
+            user_id: {
+                "username": email,  # Using email as username
+                "name": name or email,
+            }
+            for user_id, (email, name) in profiles.items()
+        }
+
     def get_leaderboard(self, game_id: int, start: int = 0, end: int = 99) -> list[dict]:
         """
         Get leaderboard for a specific game.
@@ -77,42 +254,61 @@ class LeaderboardService:
         Returns:
             List of dictionaries with user info and scores
         """
-        try:
-            game = Game.objects.get(id=game_id)
-        except Game.DoesNotExist:
+        if start == 0 and end == TOP_LEADERBOARD_SIZE - 1:
+            return cache.get_or_set(
+                self.get_top_leaderboard_cache_key(game_id),
+                lambda: self._fetch_leaderboard(game_id, start, end),
+                TOP_LEADERBOARD_CACHE_TIMEOUT,
+            )
+        return self._fetch_leaderboard(game_id, start, end)
+
+    def _fetch_leaderboard(self, game_id: int, start: int, end: int) -> list[dict]:
+        """Read a range of a game's leaderboard from Redis."""
+        score_type = get_game_score_type(game_id)
+        if score_type is None:
             return []
 
         game_key = self.get_leaderboard_key(game_id)
 
-        # Get ranked users from Redis
-        ranked_users = self.redis_client.zrevrange(
+        # Get ranked users from Redis (scores are stored so that ascending
+        # order is best first)
+        ranked_users = self.redis_client.zrange(
             game_key,
             start,
             end,
             withscores=True,
         )
 
+        return self._build_leaderboard(ranked_users, start, score_type)
+
+    def _build_leaderboard(
+        self,
+        ranked_users: list[tuple],
+        start: int,
+        game_score_type: str,
+    ) -> list[dict]:
+        """Turn (member, redis score) pairs read from Redis into leaderboard entries."""
         if not ranked_users:
             return []
 
-        # Get user details from database
-        user_ids = [int(user_id.decode()) for user_id, _ in ranked_users]
-        users = User.objects.filter(id__in=user_ids)
-        user_dict = {user.id: user for user in users}
+        # Convert member ids once and fetch all user details in one query
+        ranked_users = [(int(user_id), score) for user_id, score in ranked_users]
+        user_dict = self._get_user_details([user_id for user_id, _ in ranked_users])
 
         # Build leaderboard response
         leaderboard = []
         for rank, (user_id, redis_score) in enumerate(ranked_users, start=start + 1):
-            user_id = int(user_id.decode())
             user = user_dict.get(user_id)
 
             if user:
-                actual_score = self._convert_score_from_redis(redis_score, game.score_type)
+                actual_score = self._convert_score_from_redis(
+                    redis_score,
+                    game_score_type,
+                )
                 leaderboard.append({
                     "rank": rank,
                     "user_id": user_id,
-                    "username": user.email,  # Using email as username
-                    "name": user.name or user.email,
+                    **user,
                     "score": actual_score,
                 })
 
@@ -142,23 +338,20 @@ class LeaderboardService:
         if not ranked_users:
             return []
 
-        # Get user details from database
-        user_ids = [int(user_id.decode()) for user_id, _ in ranked_users]
-        users = User.objects.filter(id__in=user_ids)
-        user_dict = {user.id: user for user in users}
+        # Convert member ids once and fetch all user details in one query
+        ranked_users = [(int(user_id), score) for user_id, score in ranked_users]
+        user_dict = self._get_user_details([user_id for user_id, _ in ranked_users])
 
         # Build leaderboard response
         leaderboard = []
         for rank, (user_id, total_score) in enumerate(ranked_users, start=start + 1):
-            user_id = int(user_id.decode())
             user = user_dict.get(user_id)
 
             if user:
                 leaderboard.append({
                     "rank": rank,
                     "user_id": user_id,
-                    "username": user.email,
-                    "name": user.name or user.email,
+                    **user,
                     "total_score": total_score,
                 })
 
@@ -175,34 +368,40 @@ class LeaderboardService:
         Returns:
             Dictionary with user's rank info and surrounding players
         """
-        try:
-            game = Game.objects.get(id=game_id)
-        except Game.DoesNotExist:
+        score_type = get_game_score_type(game_id)
+        if score_type is None:
             return None
 
         game_key = self.get_leaderboard_key(game_id)
+        member = str(user_id)
 
-        # Get user's rank (0-indexed)
-        rank = self.redis_client.zrevrank(game_key, str(user_id))
+        # Get user's rank (0-indexed, ascending order is best first)
+        rank = self.redis_client.zrank(game_key, member)
 
         if rank is None:
             return None
 
-        # Get user's score
-        redis_score = self.redis_client.zscore(game_key, str(user_id))
-        actual_score = self._convert_score_from_redis(redis_score, game.score_type)
-
         # Get surrounding players (5 above and 5 below)
         start_rank = max(0, rank - 5)
         end_rank = rank + 5
 
-        surrounding_players = self.get_leaderboard(game_id, start_rank, end_rank)
+        # Read the user's score, the surrounding range and the player count
+        # in one round trip
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.zscore(game_key, member)
+        pipe.zrange(game_key, start_rank, end_rank, withscores=True)
+        pipe.zcard(game_key)
+        redis_score, ranked_users, total_players = pipe.execute()
 
         return {
             "user_rank": rank + 1,  # Convert to 1-indexed
-            "user_score": actual_score,
-            "surrounding_players": surrounding_players,
-            "total_players": self.redis_client.zcard(game_key),
+            "user_score": self._convert_score_from_redis(redis_score, score_type),
+            "surrounding_players": self._build_leaderboard(
+                ranked_users,
+                start_rank,
+                score_type,
+            ),
+            "total_players": total_players,
         }
 
     def get_user_global_rank(self, user_id: int) -> dict | None:
@@ -216,15 +415,16 @@ class LeaderboardService:
             Dictionary with user's global rank info
         """
         global_key = self.get_global_leaderboard_key()
+        member = str(user_id)
 
         # Get user's rank (0-indexed)
-        rank = self.redis_client.zrevrank(global_key, str(user_id))
+        rank = self.redis_client.zrevrank(global_key, member)
 
         if rank is None:
             return None
 
         # Get user's total score
-        total_score = self.redis_client.zscore(global_key, str(user_id))
+        total_score = self.redis_client.zscore(global_key, member)
 
         return {
             "user_rank": rank + 1,  # Convert to 1-indexed
@@ -236,6 +436,7 @@ class LeaderboardService:
         """Clear all scores for a specific game."""
         game_key = self.get_leaderboard_key(game_id)
         self.redis_client.delete(game_key)
+        self.invalidate_top_leaderboards(game_id)
 
     def clear_global_leaderboard(self) -> None:
         """Clear the global leaderboard."""
@@ -247,31 +448,62 @@ class LeaderboardService:
         Rebuild leaderboard from database records.
         Useful for data consistency or recovery.
         """
-        from .models import Score
+        self.rebuild_leaderboards([game_id])
 
-        try:
-            game = Game.objects.get(id=game_id)
-        except Game.DoesNotExist:
-            return
-
-        # Clear existing leaderboard
-        self.clear_leaderboard(game_id)
+    def rebuild_leaderboards(self, game_ids: list[int]) -> None:
+        """
+        Rebuild the leaderboards of several games from database records.
 
-        # Get all best scores for this game
-        user_scores = {}
-        scores = Score.objects.filter(game=game).select_related("user")
+        Each user's best score per game is aggregated in one query and every
+        leaderboard is replaced
+        in a single MULTI/EXEC round trip, so readers never see a leaderboard
+        that is only partly rebuilt.
+        """
+        from .models import Score
 
-        for score in scores:
-            user_id = score.user.id
-            current_score = float(score.score)
+        games = Game.objects.only("id", "score_type").in_bulk(game_ids)
+        if not games:
+            return
 
-            if user_id not in user_scores:
-                user_scores[user_id] = current_score
-            elif game.score_type == "highest":
-                user_scores[user_id] = max(user_scores[user_id], current_score)
-            else:  # lowest or time
-                user_scores[user_id] = min(user_scores[user_id], current_score)
+        # One row per user and game; which extreme is best depends on the score type
+        user_scores = (
+            Score.objects.filter(game_id__in=games)
+            .values_list("game_id", "user_id")
+            .annotate(highest=Max("score"), lowest=Min("score"))
+            .order_by("game_id")
+        )
 
-        # Rebuild Redis leaderboard
-        for user_id, score in user_scores.items():
-            self.update_user_score(game_id, user_id, score, game.score_type)
+        global_key = self.get_global_leaderboard_key()
+        pipe = self.redis_client.pipeline()
+        rebuilt = set()
+
+        for game_id, rows in groupby(user_scores, key=itemgetter(0)):
+            game = games[game_id]
+
+            best_scores = {}
+            for _, user_id, highest, lowest in rows:
+                score = float(highest if game.score_type == "highest" else lowest)
+                best_scores[user_id] = (game.get_redis_score(score), score)
+
+            game_key = self.get_leaderboard_key(game_id)
+            pipe.delete(game_key)
+            pipe.zadd(game_key, {
+                str(user_id): redis_score
+                for user_id, (redis_score, _) in best_scores.items()
+            })
+            # Global leaderboard keeps the original score
+            pipe.zadd(global_key, {
+                str(user_id): score for user_id, (_, score) in best_scores.items()
+            })
+            rebuilt.add(game_id)
+
+        # Games without any scores still get their stale leaderboard cleared
+        for game_id in games.keys() - rebuilt:
+            pipe.delete(self.get_leaderboard_key(game_id))
+        pipe.execute()
+
+        self.invalidate_top_leaderboards(*games)
+
+
+# Shared by all callers so they reuse one Redis connection pool
+leaderboard_service = LeaderboardService()
@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .services import leaderboard_service
+
+User = get_user_model()
+
+# User fields copied into the Redis profiles the leaderboards read
+PROFILE_FIELDS = {"email", "name"}
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Drop the user's leaderboard profile when their display fields change."""
+    # New users have no profile yet; it is stored by the first leaderboard
+    # read that lists them, keeping Redis off the signup path
+    if created or (
+        update_fields is not None and not PROFILE_FIELDS & set(update_fields)
+    ):
+        return
+    user_id = instance.pk
+    # The next leaderboard read loads the profile from the database. A failed
+    # delete only leaves the old profile in place until it expires.
+    transaction.on_commit(
+        lambda: leaderboard_service.delete_user_profile(user_id),
+        robust=True,
+    )
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    """Drop the leaderboard profile of a deleted user."""
+    user_id = instance.pk
+    transaction.on_commit(
+        lambda: leaderboard_service.delete_user_profile(user_id),
+        robust=True,
+    )
@@ -0,0 +1,167 @@
+"""
+Materialized views backing the Apache Superset dashboards.
+
+The views are created by the setup_superset_views command and refreshed on
+the Celery beat schedule, so dashboard queries read precomputed rows instead
+of aggregating over the scores table. Rollups that only ever grow at the
+latest timestamps are plain tables refreshed incrementally instead.
+"""
+
+import logging
+
+from django.db import connection
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+SUPERSET_VIEWS = (
+    "superset_game_analytics",
+    "superset_user_engagement",
+    "superset_leaderboard_trends",
+    "superset_scoring_patterns",
+    "superset_daily_metrics",
+    "superset_user_performance",
+    "superset_game_popularity",
+)
+
+# Rollups kept in plain tables and refreshed incrementally, not materialized views
+SUPERSET_ROLLUPS = ("superset_scoring_patterns",)
+
+# SQL fragments shared by the view definitions. They read the day_of_week
+# and hour_of_day columns the views derive for each score s.
+DAY_NAME_SQL = """CASE s.day_of_week
+            WHEN 0 THEN 'Sunday'
+            WHEN 1 THEN 'Monday'
+            WHEN 2 THEN 'Tuesday'
+            WHEN 3 THEN 'Wednesday'
+            WHEN 4 THEN 'Thursday'
+            WHEN 5 THEN 'Friday'
+            WHEN 6 THEN 'Saturday'
+        END"""
+
+TIME_PERIOD_SQL = """CASE
+            WHEN s.hour_of_day BETWEEN 6 AND 11 THEN 'Morning'
+            WHEN s.hour_of_day BETWEEN 12 AND 17 THEN 'Afternoon'
+            WHEN s.hour_of_day BETWEEN 18 AND 23 THEN 'Evening'
+            ELSE 'Night'
+        END"""
+
+
+def score_is_better_sql(score, other, score_type):
+    """SQL condition for score beating other under the game's score type."""
+    return (
+        f"(({score_type} = 'highest' AND {score} > {other})"
+        f" OR ({score_type} IN ('lowest', 'time') AND {score} < {other}))"
+    )
+
+
+# Hourly scoring patterns per game for scores submitted since %(since)s.
+# Only the constant fragments above are interpolated; the start time is a
+# query parameter.
+SCORING_PATTERNS_SELECT = f"""
+    WITH bucketed_scores AS (
+        -- Decompose each timestamp once for the grouping and labels below
+        SELECT
+            s.*,
+            DATE_TRUNC('hour', s.submitted_at) as hour_bucket,
+            DATE(s.submitted_at) as submission_date,
+            EXTRACT(HOUR FROM s.submitted_at)::int as hour_of_day,
+            EXTRACT(DOW FROM s.submitted_at)::int as day_of_week
+        FROM scores_score s
+        WHERE s.submitted_at >= %(since)s
+    )
+    SELECT
+        s.hour_bucket,
+        s.submission_date,
+        s.hour_of_day,
+        s.day_of_week,
+        {DAY_NAME_SQL} as day_name,
+        {TIME_PERIOD_SQL} as time_period,
+        s.game_id,
+        g.name as game_name,
+        g.score_type,
+        COUNT(*) as submission_count,
+        COUNT(DISTINCT s.user_id) as unique_users,
+        AVG(s.score::float8) as avg_score,
+        MAX(s.score) as max_score,
+        MIN(s.score) as min_score,
+        COALESCE(AVG(s.level), 0) as avg_level,
+        COALESCE(AVG(s.time_played), 0) as avg_time_played,
+        COUNT(*) FILTER (WHERE s.difficulty = 'easy') as easy_count,
+        COUNT(*) FILTER (WHERE s.difficulty = 'medium') as medium_count,
+        COUNT(*) FILTER (WHERE s.difficulty = 'hard') as hard_count
+    FROM bucketed_scores s
+    JOIN games_game g ON s.game_id = g.id
+    GROUP BY
+        s.hour_bucket,
+        s.submission_date,
+        s.hour_of_day,
+        s.day_of_week,
+        s.game_id,
+        g.name,
+        g.score_type
+"""  # noqa: S608
+
+
+def get_view_kinds(cursor, view_names=SUPERSET_VIEWS):
+    """Map each existing view name to its pg_class relkind ("v", "m" or "r")."""
+    cursor.execute(
+        "SELECT relname, relkind FROM pg_class"
+        " WHERE relname = ANY(%s) AND relkind IN ('v', 'm', 'r')",
+        [list(view_names)],
+    )
+    return dict(cursor.fetchall())
+
+
+def get_expected_kind(view_name):
+    """The pg_class relkind setup_superset_views creates the view as."""
+    return "r" if view_name in SUPERSET_ROLLUPS else "m"
+
+
+def refresh_scoring_patterns(cursor):
+    """
+    Recompute the latest hour buckets of the scoring patterns rollup.
+
+    Scores are only appended, so older buckets are final. The last stored
+    bucket and the one before it are rebuilt to pick up scores committed
+    after the previous refresh. An empty rollup is filled from scratch.
+    """
+    cursor.execute(
+        "SELECT MAX(hour_bucket) - INTERVAL '1 hour' FROM superset_scoring_patterns;",
+    )
+    params = {"since": cursor.fetchone()[0] or "-infinity"}
+    with transaction.atomic():
+        cursor.execute(
+            "DELETE FROM superset_scoring_patterns WHERE hour_bucket >= %(since)s;",
+            params,
+        )
+        cursor.execute(
+            f"INSERT INTO superset_scoring_patterns {SCORING_PATTERNS_SELECT};",
+            params,
+        )
+
+
+def refresh_superset_views(view_names=SUPERSET_VIEWS):
+    """
+    Refresh the given materialized views and return the refreshed names.
+
+    Refreshes run CONCURRENTLY so dashboards keep reading the previous rows
+    meanwhile, and rollups only recompute their latest rows. Views that have
+    not been created yet are skipped.
+    """
+    refreshed = []
+    with connection.cursor() as cursor:
+        view_kinds = get_view_kinds(cursor, view_names)
+        for view_name in view_names:
+            if view_kinds.get(view_name) != get_expected_kind(view_name):
+                logger.warning(
+                    "Skipping %s, run setup_superset_views to create it",
+                    view_name,
+                )
+                continue
+            if view_name == "superset_scoring_patterns":
+                refresh_scoring_patterns(cursor)
+            else:
+                cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view_name};")
+            refreshed.append(view_name)
+    return refreshed
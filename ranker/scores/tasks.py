@@ -0,0 +1,73 @@
+from celery import shared_task
+
+from . import reports
+from . import superset
+from .models import Score
+
+
+@shared_task()
+def submit_score_to_db(user_id, game_id, score, metadata, submission_id):
+    """
+    Store a score whose leaderboard entry was already updated.
+
+    The submission id is unique, so a retried task does not store the score
+    twice.
+    """
+    submission = Score(
+        user_id=user_id,
+        game_id=game_id,
+        score=score,
+        metadata=metadata,
+        submission_id=submission_id,
+    )
+    # bulk_create() does not call save()
+    submission.set_metadata_fields()
+    # INSERT ... ON CONFLICT DO NOTHING
+    Score.objects.bulk_create([submission], ignore_conflicts=True)
+
+
+@shared_task()
+def build_game_analytics(period, game_id=None):
+    """Build the game analytics report and cache it."""
+    payload = reports.game_analytics(period, game_id)
+    reports.cache_report("game_analytics", period, game_id, payload=payload)
+
+
+@shared_task()
+def build_user_engagement(period):
+    """Build the user engagement report and cache it."""
+    payload = reports.user_engagement(period)
+    reports.cache_report("user_engagement", period, payload=payload)
+
+
+@shared_task()
+def build_leaderboard_trends(period, game_id):
+    """Build the leaderboard trends report for a game and cache it."""
+    payload = reports.leaderboard_trends(period, game_id)
+    if payload is None:
+        # The game was deleted after the build was requested
+        reports.release_report_build("leaderboard_trends", period, game_id)
+        return
+    reports.cache_report("leaderboard_trends", period, game_id, payload=payload)
+
+
+@shared_task()
+def build_scoring_patterns(period, game_id=None):
+    """Build the scoring patterns report and cache it."""
+    payload = reports.scoring_patterns(period, game_id)
+    reports.cache_report("scoring_patterns", period, game_id, payload=payload)
+
+
+@shared_task()
+def refresh_reports():
+    """Enqueue a rebuild of the site-wide reports for every period."""
+    for period in reports.REPORT_PERIODS:
+        build_game_analytics.delay(period)
+        build_user_engagement.delay(period)
+        build_scoring_patterns.delay(period)
+
+
+@shared_task()
+def refresh_superset_views(view_names=None):
+    """Refresh the Superset materialized views, all of them by default."""
+    superset.refresh_superset_views(view_names or superset.SUPERSET_VIEWS)
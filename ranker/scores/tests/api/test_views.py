@@ -0,0 +1,144 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework.test import force_authenticate
+
+from ranker.scores.api.views import GameAnalyticsView
+from ranker.scores.api.views import ScoreHistoryView
+from ranker.scores.api.views import ScoreViewSet
+from ranker.scores.models import Score
+from ranker.scores.reports import cache_report
+from ranker.scores.tests.factories import ScoreFactory
+from ranker.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+class TestGameAnalyticsView:
+    @pytest.fixture(autouse=True)
+    def _locmem_cache(self, settings):
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        }
+        cache.clear()
+
+    def get(self, user: User, path: str = "/fake-url/"):
+        request = APIRequestFactory().get(path)
+        force_authenticate(request, user=user)
+        return GameAnalyticsView.as_view()(request)
+
+    def test_serves_cached_report(self, admin_user: User):
+        cache_report("game_analytics", "weekly", None, payload={"period": "weekly"})
+
+        response = self.get(admin_user)
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert response.data == {"period": "weekly"}
+
+    def test_enqueues_build_once_when_not_cached(self, admin_user: User):
+        with mock.patch("ranker.scores.api.views.build_game_analytics") as task:
+            first = self.get(admin_user)
+            second = self.get(admin_user)
+
+        assert first.status_code == second.status_code == 202  # noqa: PLR2004
+        task.delay.assert_called_once_with("weekly", None)
+
+    def test_invalid_period(self, admin_user: User):
+        response = self.get(admin_user, "/fake-url/?period=yearly")
+
+        assert response.status_code == 400  # noqa: PLR2004
+
+
+class TestScoreViewSet:
+    def test_list_loads_related_objects_in_one_query(self, django_assert_num_queries):
+        scores = ScoreFactory.create_batch(3)
+        ScoreFactory.create_batch(2, user=scores[0].user)
+        request = APIRequestFactory().get("/fake-url/")
+        force_authenticate(request, user=scores[0].user)
+
+        with django_assert_num_queries(1):
+            response = ScoreViewSet.as_view({"get": "list"})(request)
+            response.render()
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert len(response.data) == 3  # noqa: PLR2004
+
+
+class TestScoreHistoryView:
+    def get(self, user: User, **params):
+        request = APIRequestFactory().get("/fake-url/", params)
+        force_authenticate(request, user=user)
+        return ScoreHistoryView.as_view()(request)
+
+    def test_pages_through_equal_timestamps(self, user: User):
+        first = ScoreFactory(user=user)
+        scores = [first, *ScoreFactory.create_batch(4, user=user, game=first.game)]
+        # Three scores share a timestamp, straddling the first page boundary
+        now = timezone.now()
+        Score.objects.filter(pk__in=[score.pk for score in scores[:3]]).update(
+            submitted_at=now,
+        )
+        Score.objects.filter(pk__in=[score.pk for score in scores[3:]]).update(
+            submitted_at=now - timedelta(hours=1),
+        )
+
+        seen = []
+        params = {"game_id": first.game_id, "page_size": 2}
+        for _ in scores:
+            data = self.get(user, **params).data
+            seen += [score["id"] for score in data["scores"]]
+            if not data["has_next"]:
+                break
+            params["before"] = data["next_before"]
+            params["before_id"] = data["next_before_id"]
+
+        # Newest first, ties broken by the higher id
+        expected = [*reversed(scores[:3]), *reversed(scores[3:])]
+        assert seen == [score.pk for score in expected]
+        assert data["next_before"] is None
+        assert "page" not in data
+
+    def test_last_page_has_no_next(self, user: User):
+        score = ScoreFactory(user=user)
+
+        data = self.get(user, game_id=score.game_id, page_size=2).data
+
+        assert [row["id"] for row in data["scores"]] == [score.pk]
+        assert data["page"] == 1
+        assert data["has_next"] is False
+        assert data["next_before"] is None
+        assert data["next_before_id"] is None
+
+    # Filtering on a naive datetime under USE_TZ warns
+    @pytest.mark.filterwarnings("error::RuntimeWarning")
+    def test_naive_before_is_read_as_local_time(self, user: User):
+        newer = ScoreFactory(user=user)
+        older = ScoreFactory(user=user, game=newer.game)
+        Score.objects.filter(pk=older.pk).update(
+            submitted_at=newer.submitted_at - timedelta(hours=1),
+        )
+        # Read as UTC instead, this would fall hours after the newer score
+        before = timezone.localtime(newer.submitted_at - timedelta(seconds=1))
+
+        response = self.get(
+            user,
+            game_id=newer.game_id,
+            before=before.replace(tzinfo=None).isoformat(),
+        )
+
+        assert [row["id"] for row in response.data["scores"]] == [older.pk]
+
+    @pytest.mark.parametrize(
+        "params",
+        [{"before": "yesterday"}, {"before": "2024-01-01T00:00:00", "before_id": "x"}],
+    )
+    def test_invalid_cursor(self, user: User, params):
+        score = ScoreFactory(user=user)
+
+        response = self.get(user, game_id=score.game_id, **params)
+
+        assert response.status_code == 400  # noqa: PLR2004
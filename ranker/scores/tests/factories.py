@@ -0,0 +1,24 @@
+from decimal import Decimal
+
+from factory import SubFactory
+from factory.django import DjangoModelFactory
+
+from ranker.games.tests.factories import GameFactory
+from ranker.scores.models import Score
+from ranker.users.tests.factories import UserFactory
+
+
+class ScoreFactory(DjangoModelFactory[Score]):
+    user = SubFactory(UserFactory)
+    game = SubFactory(GameFactory)
+    score = Decimal("100.00")
+
+    class Meta:
+        model = Score
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        # Tests don't run against Redis, so skip the leaderboard update
+        score = model_class(*args, **kwargs)
+        score.save(update_leaderboard=False)
+        return score
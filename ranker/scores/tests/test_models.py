@@ -0,0 +1,103 @@
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+
+from ranker.games.cache import get_game_cached
+from ranker.games.tests.factories import GameFactory
+from ranker.scores.models import Score
+from ranker.scores.tests.factories import ScoreFactory
+from ranker.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_bulk_submit(django_capture_on_commit_callbacks):
+    """Scores are inserted and sent to Redis as a single batch on commit."""
+    game = GameFactory(score_type="lowest")
+    user = UserFactory()
+
+    with (
+        mock.patch("ranker.scores.services.leaderboard_service") as service,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        scores = Score.bulk_submit([
+            Score(user=user, game=game, score=Decimal("12.50")),
+            Score(user=user, game=game, score=Decimal("9.00")),
+        ])
+
+    assert Score.objects.filter(user=user, game=game).count() == len(scores) == 2  # noqa: PLR2004
+    service.update_user_scores.assert_called_once_with([
+        (game.id, user.id, 12.5, "lowest"),
+        (game.id, user.id, 9.0, "lowest"),
+    ])
+
+
+def test_save_updates_leaderboard_on_commit(django_capture_on_commit_callbacks):
+    """A new score reaches the leaderboard only once the transaction commits."""
+    score = Score(user=UserFactory(), game=GameFactory(), score=Decimal("10.00"))
+
+    with (
+        mock.patch.object(Score, "update_redis_leaderboard") as update,
+        django_capture_on_commit_callbacks() as callbacks,
+    ):
+        score.save()
+        update.assert_not_called()
+
+    assert callbacks == [update]
+
+
+def test_update_redis_leaderboard_uses_cached_game(settings, django_assert_num_queries):
+    """Pushing a stored score to Redis doesn't load its game or user."""
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+    stored = ScoreFactory(game=GameFactory(score_type="time"), score=Decimal("42.00"))
+    score = Score.objects.get(pk=stored.pk)
+    get_game_cached(score.game_id)
+
+    with (
+        mock.patch("ranker.scores.services.leaderboard_service") as service,
+        django_assert_num_queries(0),
+    ):
+        score.update_redis_leaderboard()
+
+    service.update_user_score.assert_called_once_with(
+        game_id=score.game_id,
+        user_id=score.user_id,
+        score=42.0,
+        game_score_type="time",
+    )
+
+
+def test_best_scores_for():
+    """Each user's best score per game follows the game's score type."""
+    highest = GameFactory(score_type="highest")
+    lowest = GameFactory(score_type="lowest")
+    user, other_user = UserFactory(), UserFactory()
+    for game in (highest, lowest):
+        for value in ("5.00", "9.00", "7.00"):
+            ScoreFactory(user=user, game=game, score=Decimal(value))
+    ScoreFactory(user=other_user, game=highest, score=Decimal("1.00"))
+
+    best = {
+        (score.user_id, score.game_id): score.score
+        for score in Score.best_scores_for([user, other_user], [highest, lowest])
+    }
+
+    assert best == {
+        (user.id, highest.id): Decimal("9.00"),
+        (user.id, lowest.id): Decimal("5.00"),
+        (other_user.id, highest.id): Decimal("1.00"),
+    }
+    assert Score.get_user_best_score(user, lowest).score == Decimal("5.00")
+
+
+def test_save_copies_metadata_columns():
+    """The promoted metadata keys are stored in typed columns, bad values as NULL."""
+    score = ScoreFactory(
+        metadata={"difficulty": "hard", "level": 3, "time_played": "bad"},
+    )
+
+    score.refresh_from_db()
+    assert (score.difficulty, score.level, score.time_played) == ("hard", 3, None)
@@ -0,0 +1,73 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+from ranker.scores.models import Score
+from ranker.scores.reports import game_analytics
+from ranker.scores.reports import scoring_patterns
+from ranker.scores.reports import user_engagement
+from ranker.scores.tests.factories import ScoreFactory
+from ranker.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def test_user_engagement_sessions_per_day(user: User):
+    scores = ScoreFactory.create_batch(4, user=user)
+    two_days_ago = timezone.now() - timedelta(days=2)
+    Score.objects.filter(pk=scores[0].pk).update(submitted_at=two_days_ago)
+
+    activity = user_engagement("weekly")["user_activity"]
+
+    assert len(activity) == 1
+    assert activity[0]["total_sessions"] == 4  # noqa: PLR2004
+    assert activity[0]["sessions_per_day"] == "2.00"
+
+
+def test_user_engagement_counts_short_spans_as_one_day(user: User):
+    ScoreFactory.create_batch(3, user=user)
+
+    activity = user_engagement("daily")["user_activity"]
+
+    assert activity[0]["sessions_per_day"] == "3.00"
+
+
+def test_game_analytics_score_distribution():
+    for score in [10, 20, 30, 40, 50]:
+        ScoreFactory(score=Decimal(score))
+
+    distribution = game_analytics("weekly")["score_distribution"]
+
+    assert distribution == {
+        "total_scores": 5,
+        "percentile_25": "20.00",
+        "percentile_50": "30.00",
+        "percentile_75": "40.00",
+        "std_deviation": "15.81",
+    }
+
+
+def test_scoring_patterns_metadata_patterns():
+    metadata = {"difficulty": "hard", "level": 2}
+    ScoreFactory.create_batch(2, score=Decimal(10), metadata=metadata)
+    ScoreFactory(score=Decimal(30), metadata={"level": "x"})
+    ScoreFactory()
+
+    patterns = scoring_patterns("weekly")["metadata_patterns"]
+
+    assert patterns == [
+        {
+            "metadata__difficulty": "hard",
+            "metadata__level": 2,
+            "avg_score": "10.00",
+            "count": 2,
+        },
+        {
+            "metadata__difficulty": None,
+            "metadata__level": None,
+            "avg_score": "30.00",
+            "count": 1,
+        },
+    ]
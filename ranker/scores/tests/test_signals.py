@@ -0,0 +1,27 @@
+from unittest import mock
+
+import pytest
+
+from ranker.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def test_user_profile_follows_user_changes(django_capture_on_commit_callbacks):
+    """Profiles are dropped on commit, skipping saves that don't touch them."""
+    with (
+        mock.patch("ranker.scores.signals.leaderboard_service") as service,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        user = User.objects.create_user(
+            email="player@example.com",
+            password="something-r@nd0m!",  # noqa: S106
+            name="Player",
+        )
+        user.save(update_fields=["last_login"])
+        user.name = "Renamed"
+        user.save()
+        user_id = user.pk
+        user.delete()
+
+    assert service.delete_user_profile.call_args_list == [mock.call(user_id)] * 2
@@ -0,0 +1,97 @@
+import uuid
+from decimal import Decimal
+
+import pytest
+from celery.result import EagerResult
+from django.db import connection
+
+from ranker.games.tests.factories import GameFactory
+from ranker.scores.management.commands.setup_superset_views import GAME_ANALYTICS_SQL
+from ranker.scores.management.commands.setup_superset_views import SCORING_PATTERNS_SQL
+from ranker.scores.models import Score
+from ranker.scores.reports import claim_report_build
+from ranker.scores.reports import get_cached_report
+from ranker.scores.tasks import build_game_analytics
+from ranker.scores.tasks import build_leaderboard_trends
+from ranker.scores.tasks import refresh_superset_views
+from ranker.scores.tasks import submit_score_to_db
+from ranker.scores.tests.factories import ScoreFactory
+from ranker.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_build_game_analytics(settings):
+    """The game analytics task caches the report it builds."""
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+    game = GameFactory()
+
+    task_result = build_game_analytics.delay("weekly", game.id)
+
+    assert isinstance(task_result, EagerResult)
+    report = get_cached_report("game_analytics", "weekly", game.id)
+    assert report["period"] == "weekly"
+    assert report["games_performance"] == []
+
+
+def test_build_leaderboard_trends_for_missing_game(settings):
+    """A build for a deleted game releases its lock without caching a report."""
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+    assert claim_report_build("leaderboard_trends", "weekly", 0)
+
+    build_leaderboard_trends("weekly", 0)
+
+    assert get_cached_report("leaderboard_trends", "weekly", 0) is None
+    assert claim_report_build("leaderboard_trends", "weekly", 0)
+
+
+def test_refresh_superset_views(settings):
+    """Created views are refreshed with the latest scores, missing ones skipped."""
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+    with connection.cursor() as cursor:
+        cursor.execute(GAME_ANALYTICS_SQL)
+    game = GameFactory()
+
+    refresh_superset_views.delay(
+        ["superset_game_analytics", "superset_game_popularity"],
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT game_id FROM superset_game_analytics")
+        assert cursor.fetchall() == [(game.id,)]
+
+
+def test_refresh_superset_views_updates_scoring_patterns(settings):
+    """The scoring patterns rollup picks up scores added since it was built."""
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+    game = GameFactory()
+    ScoreFactory(game=game)
+    with connection.cursor() as cursor:
+        cursor.execute(SCORING_PATTERNS_SQL)
+    ScoreFactory.create_batch(2, game=game)
+
+    refresh_superset_views.delay(["superset_scoring_patterns"])
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT game_id, submission_count FROM superset_scoring_patterns",
+        )
+        assert cursor.fetchall() == [(game.id, 3)]
+
+
+def test_submit_score_to_db_is_idempotent():
+    """A retried submission is only stored once."""
+    user = UserFactory()
+    game = GameFactory()
+    submission_id = str(uuid.uuid4())
+
+    for _ in range(2):
+        submit_score_to_db(user.id, game.id, "12.50", {"level": "3"}, submission_id)
+
+    stored = Score.objects.filter(submission_id=submission_id)
+    assert list(stored.values_list("score", "level")) == [(Decimal("12.50"), 3)]